@@ -68,6 +68,14 @@ type ValidatorRequest struct {
 	Keystore Keystore `json:"keystore" form:"keystore"`
 }
 
+// rawValidatorRequest has the same wire format as ValidatorRequest but keeps
+// the keystore as the bytes the client sent, so handlers can validate and
+// write them without a decode/re-encode round trip.
+type rawValidatorRequest struct {
+	Name     string          `json:"name"`
+	Keystore json.RawMessage `json:"keystore"`
+}
+
 // DeleteValidatorRequest represents the payload for deleting a validator definition.
 // swagger:model DeleteValidatorRequest
 type DeleteValidatorRequest struct {
@@ -741,15 +749,12 @@ func deleteValidatorDefinitionsFile(datadir, network string) error {
 // @Router /validator [post]
 func createValidatorHandler(lighthouseArgs []string) echo.HandlerFunc {
 	return func(c echo.Context) error {
-		var req ValidatorRequest
+		var req rawValidatorRequest
 		if err := c.Bind(&req); err != nil {
 			return c.String(http.StatusBadRequest, fmt.Sprintf("Invalid request: %v", err))
 		}
 
-		keystoreBytes, err := json.Marshal(req.Keystore)
-		if err != nil {
-			return c.String(http.StatusBadRequest, fmt.Sprintf("Error processing keystore: %v", err))
-		}
+		keystoreBytes := []byte(req.Keystore)
 		if err := validateEIP2335Keystore(keystoreBytes); err != nil {
 			return c.String(http.StatusBadRequest, fmt.Sprintf("Invalid keystore format: %v", err))
 		}
@@ -892,15 +897,12 @@ func getValidatorsHandler(lighthouseArgs []string) echo.HandlerFunc {
 // @Router /validator [put]
 func updateValidatorHandler(lighthouseArgs []string) echo.HandlerFunc {
 	return func(c echo.Context) error {
-		var req ValidatorRequest
+		var req rawValidatorRequest
 		if err := c.Bind(&req); err != nil {
 			return c.String(http.StatusBadRequest, fmt.Sprintf("Invalid request: %v", err))
 		}
 
-		keystoreBytes, err := json.Marshal(req.Keystore)
-		if err != nil {
-			return c.String(http.StatusBadRequest, fmt.Sprintf("Error processing keystore: %v", err))
-		}
+		keystoreBytes := []byte(req.Keystore)
 		if err := validateEIP2335Keystore(keystoreBytes); err != nil {
 			return c.String(http.StatusBadRequest, fmt.Sprintf("Invalid keystore format: %v", err))
 		}
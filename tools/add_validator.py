@@ -5,32 +5,1007 @@ add_validator.py
 Read an EIP-2335 keystore JSON file and POST it to the lighthouse-launch
 /createValidatorHandler endpoint ( /validator ).
 
+Given a directory, a glob, or several paths, the tool switches to bulk mode:
+every ``keystore-*.json`` / ``voting-keystore.json`` found is uploaded over a
+shared keep-alive session by a pool of worker threads, and a summary of
+created, conflicted (409) and failed keys is printed at the end.
+
+With ``--journal`` every upload attempt is appended (and fsync'd) to a JSON
+lines file keyed by pubkey; a rerun skips keystores the journal already
+records as committed without contacting the server. The launcher answers 409
+whenever the name is taken, so a 409 only counts as committed once
+``GET /validator?name=`` confirms the name holds the same pubkey; a name
+held by another key is a failure.
+
+Before uploading, bulk mode fetches the server's ``GET /validator`` listing
+once and drops keystores whose pubkey is already present, so large
+re-imports do not resend keystores only to be answered with 409. Every name
+is rendered before anything is sent: an empty name (a ``{pubkey}`` template
+over a keystore without one), a name that is not a single path component,
+or a name shared by two keystores aborts the run.
+
+``--engine asyncio`` drives the uploads from an event loop instead: keystores
+are pulled lazily from a generator and an ``asyncio.Semaphore`` caps the
+number of in-flight POSTs, so memory stays flat however many keys are
+queued. Both engines report per-request latency and throughput.
+
+Every keystore is first checked locally with the same rules as the
+launcher's ``validateEIP2335Keystore``, spread over a process pool; if any
+file is rejected, a consolidated report is printed and nothing is uploaded.
+
+Given ``--password-file`` or ``--password-map``, bulk mode also derives each
+keystore's decryption key with its own scrypt/pbkdf2 parameters and checks
+``crypto.checksum`` (again in a process pool), so a wrong password is caught
+before upload rather than when Lighthouse starts. ``--verify-cache`` keeps
+(uuid, keyed password digest) pairs that already passed so reruns skip the
+KDF; the HMAC key lives next to it in ``<cache>.key``.
+
+Bulk uploads never parse and re-serialize a keystore: the file's bytes are
+spliced verbatim into the request body, and only the pubkey is picked out of
+them for naming, the journal and the preflight index.
+
+``--adaptive`` replaces the fixed concurrency with an AIMD limit: it grows
+by one per window while the recent p95 POST latency stays under
+``--target-p95-ms`` and halves on timeouts or 5xx, never exceeding
+``--workers``. ``--retry-budget`` allows that many retries in total across
+the run, each after a jittered exponential backoff.
+
 Usage
 =====
     python upload_validator.py /path/to/voting-keystore.json
         [--name V1] [--url http://my-server:5000]
 
+    python upload_validator.py /path/to/validator_keys/
+        [--name-template "{pubkey}"] [--workers 16] [--url http://my-server:5000]
+        [--journal upload-journal.jsonl] [--no-preflight]
+        [--engine asyncio] [--validate-procs 8]
+        [--password-file pw.txt | --password-map passwords.json]
+        [--verify-cache verified.txt]
+        [--adaptive --target-p95-ms 1000] [--retry-budget 100]
+
 Arguments
 ---------
 positional:
-  keystore_path        Path to the voting-keystore.json file.
+  keystore_path        Path to the voting-keystore.json file, or (bulk mode)
+                       one or more files, directories or glob patterns.
 
 optional:
   -n, --name           Validator name              (default: "V0")
   -u, --url            URL prefix *without* /validator
                        (default: "http://localhost:5000")
+  --name-template      Bulk mode validator name; may use {index}, {stem},
+                       {parent} and {pubkey}       (default: "{pubkey}")
+  -w, --workers        Bulk mode concurrent uploads (default: 8)
+  --engine             Bulk mode engine: threads or asyncio (default: threads)
+  --validate-procs     Bulk mode validation processes (default: CPU count)
+  --no-validate        Bulk mode: skip local EIP-2335 validation
+  --password-file      Bulk mode: verify every keystore against this password
+  --password-map       Bulk mode: JSON object mapping pubkey, uuid or file
+                       name to password, for per-keystore verification
+  --verify-cache       Bulk mode: cache of already verified (uuid, password);
+                       its HMAC key is kept in <cache>.key
+  --adaptive           Bulk mode: AIMD concurrency up to --workers
+  --target-p95-ms      Bulk mode: p95 latency the AIMD limit grows under
+                       (default: 1000)
+  --retry-budget       Bulk mode: total retries for timeouts/5xx (default: 0)
+  --journal            Bulk mode resumable upload journal (JSON lines)
+  --no-preflight       Bulk mode: skip the GET /validator dedupe snapshot
 """
 
 import argparse
+import asyncio
+import fnmatch
+import glob
+import hashlib
 import json
+import hmac
+import os
+import random
+import re
+import string
 import sys
+import threading
+import time
+import unicodedata
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+
+TIMEOUT_SECS = 10
+KEYSTORE_PATTERNS = ("keystore-*.json", "voting-keystore.json")
+JSON_HEADERS = {"Content-Type": "application/json"}
+COMMITTED_STATUSES = (201, 409)  # the keystore is on the server either way
+PUBKEY_RE = re.compile(rb'"pubkey"\s*:\s*"((?:0x)?[0-9a-fA-F]*)"')
+UUID_RE = re.compile(r"^[a-f0-9]{8}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{12}$")
+BACKOFF_BASE_SECS = 0.25
+BACKOFF_CAP_SECS = 10.0
+LATENCY_WINDOW = 32  # recent POSTs the AIMD limiter judges p95 over
+INLINE_VALIDATION_MAX = 32  # below this, a process pool costs more than it saves
+# EIP-2335 password processing drops C0, C1 and DEL control codes.
+CONTROL_CODES = dict.fromkeys(
+    list(range(0x00, 0x20)) + list(range(0x80, 0xA0)) + [0x7F]
+)
+
+
+@dataclass
+class UploadResult:
+    path: str
+    name: str
+    status: int  # HTTP status, or 0 when no response was received
+    detail: str
+    pubkey: str = ""
+    skipped: str = ""  # reason the upload was not attempted, if any
+    elapsed: float = 0.0  # seconds spent on the POST, when one was made
+    retries: int = 0
+    conflict: str = ""  # why the name is taken by a different keystore, if it is
+
+    @property
+    def committed(self) -> bool:
+        return self.status in COMMITTED_STATUSES and not self.conflict
+
+
+# ───────────────────────── Keystore discovery ──────────────────────────
+def _is_keystore_file(path: str) -> bool:
+    base = os.path.basename(path)
+    return any(fnmatch.fnmatch(base, pat) for pat in KEYSTORE_PATTERNS)
+
+
+def discover_keystores(specs: List[str]) -> List[str]:
+    """
+    Expand files, directories (searched recursively) and glob patterns into
+    a sorted, de-duplicated list of keystore paths.
+    """
+    found = set()
+    for spec in specs:
+        if os.path.isdir(spec):
+            for root, _dirs, files in os.walk(spec):
+                for fname in files:
+                    path = os.path.join(root, fname)
+                    if _is_keystore_file(path):
+                        found.add(os.path.normpath(path))
+        elif glob.has_magic(spec):
+            for path in glob.glob(spec, recursive=True):
+                if os.path.isfile(path):
+                    found.add(os.path.normpath(path))
+        else:
+            found.add(os.path.normpath(spec))
+    return sorted(found)
+
+
+def is_bulk_request(specs: List[str]) -> bool:
+    return len(specs) > 1 or any(
+        os.path.isdir(s) or glob.has_magic(s) for s in specs
+    )
+
+
+def normalize_pubkey(pubkey: str) -> str:
+    """Lowercase, 0x-prefixed form used for names, journal and indexes."""
+    pk = str(pubkey or "").strip().lower()
+    if pk and not pk.startswith("0x"):
+        pk = "0x" + pk
+    return pk
+
+
+def validator_name(template: str, index: int, path: str, pubkey: str) -> str:
+    return template.format(
+        index=index,
+        stem=os.path.splitext(os.path.basename(path))[0],
+        parent=os.path.basename(os.path.dirname(os.path.abspath(path))),
+        pubkey=pubkey,
+    )
+
+
+def check_names(paths: List[str], template: str) -> List[Tuple[str, str]]:
+    """
+    Render every keystore's name as the upload would and return (path, error)
+    for names that are empty, not a single path component, or shared with
+    another keystore. The launcher stores each keystore under its name, so any
+    of these would write to the wrong place or be refused with a 409.
+    """
+    bad: List[Tuple[str, str]] = []
+    owners: Dict[str, str] = {}
+    for index, path in enumerate(paths):
+        try:
+            with open(path, "rb") as f:
+                pubkey = raw_keystore_pubkey(f.read())
+            name = validator_name(template, index, path, pubkey)
+        except (OSError, ValueError, KeyError, IndexError) as exc:
+            bad.append((path, f"unable to render name: {exc}"))
+            continue
+        if not name.strip():
+            bad.append((path, f"name template {template!r} renders an empty name"
+                              + ("" if pubkey else " (keystore has no pubkey)")))
+        elif "/" in name or "\\" in name or name in (".", ".."):
+            bad.append((path, f"name {name!r} is not a single path component"))
+        elif name in owners:
+            bad.append((path, f"name {name!r} is also rendered for {owners[name]}"))
+        else:
+            owners[name] = path
+    return bad
+
+
+def raw_keystore_pubkey(raw: bytes) -> str:
+    """Pick the pubkey out of keystore bytes without decoding the document."""
+    m = PUBKEY_RE.search(raw)
+    return normalize_pubkey(m.group(1).decode("ascii")) if m else ""
+
+
+def request_body(name: str, raw_keystore: bytes) -> bytes:
+    """POST /validator body with the keystore bytes spliced in unchanged."""
+    return b"".join((
+        b'{"name":', json.dumps(name).encode("utf-8"),
+        b',"keystore":', raw_keystore, b"}",
+    ))
+
+
+# ──────────────────────── EIP-2335 validation ──────────────────────────
+def _validate_module(name: str, mod: object) -> str:
+    if not isinstance(mod, dict) or not mod.get("function"):
+        return f"missing required field: {name}.function"
+    if mod.get("params") is None:
+        return f"missing required field: {name}.params"
+    return ""
+
+
+def validate_eip2335_keystore(keystore: object) -> str:
+    """
+    Mirror lighthouse-launch's validateEIP2335Keystore; return the first
+    problem found, or '' if the keystore would be accepted.
+    """
+    if not isinstance(keystore, dict):
+        return "invalid JSON: keystore must be an object"
+    for field in ("path", "uuid"):
+        if not isinstance(keystore.get(field, ""), str):
+            return f"invalid JSON: {field} must be a string"
+    if not keystore.get("path"):
+        return "missing required field: path"
+    if not keystore.get("uuid"):
+        return "missing required field: uuid"
+    if not UUID_RE.match(keystore["uuid"]):
+        return "invalid uuid format"
+    version = keystore.get("version", 0)
+    if not isinstance(version, int) or isinstance(version, bool) or version < 1:
+        return "invalid version: must be a number greater than or equal to 1"
+    crypto = keystore.get("crypto") or {}
+    if not isinstance(crypto, dict):
+        return "invalid JSON: crypto must be an object"
+    for module in ("kdf", "checksum", "cipher"):
+        err = _validate_module(module, crypto.get(module) or {})
+        if err:
+            return f"invalid crypto.{module}: {err}"
+    return ""
+
+
+def _validate_file(path: str) -> Tuple[str, str]:
+    try:
+        with open(path, "rb") as f:
+            keystore = json.load(f)
+    except OSError as exc:
+        return path, f"unable to read keystore: {exc}"
+    except ValueError as exc:
+        return path, f"invalid JSON: {exc}"
+    return path, validate_eip2335_keystore(keystore)
+
+
+def validate_keystores(paths: List[str], procs: int) -> List[Tuple[str, str]]:
+    """Validate every keystore across `procs` processes; return (path, error) for bad files."""
+    if len(paths) <= INLINE_VALIDATION_MAX or procs <= 1:
+        checked = map(_validate_file, paths)
+        return [(path, err) for path, err in checked if err]
+    chunksize = max(1, len(paths) // (procs * 4))
+    with ProcessPoolExecutor(max_workers=procs) as pool:
+        checked = pool.map(_validate_file, paths, chunksize=chunksize)
+        return [(path, err) for path, err in checked if err]
+
+
+# ──────────────────────── Password verification ────────────────────────
+def normalize_password(password: str) -> bytes:
+    """EIP-2335 password processing: NFKD, strip control codes, UTF-8."""
+    return unicodedata.normalize("NFKD", password).translate(CONTROL_CODES).encode("utf-8")
+
+
+def derive_decryption_key(kdf: Dict, password: bytes) -> bytes:
+    params = kdf["params"]
+    salt = bytes.fromhex(params["salt"])
+    dklen = int(params["dklen"])
+    if kdf["function"] == "scrypt":
+        n, r, p = int(params["n"]), int(params["r"]), int(params["p"])
+        return hashlib.scrypt(
+            password, salt=salt, n=n, r=r, p=p, dklen=dklen,
+            maxmem=128 * r * (n + p + 2) + (1 << 20),
+        )
+    if kdf["function"] == "pbkdf2":
+        if params.get("prf", "hmac-sha256") != "hmac-sha256":
+            raise ValueError(f"unsupported pbkdf2 prf: {params['prf']}")
+        return hashlib.pbkdf2_hmac("sha256", password, salt, int(params["c"]), dklen)
+    raise ValueError(f"unsupported kdf: {kdf['function']}")
+
+
+def verify_keystore_password(keystore: Dict, password: str) -> str:
+    """Return '' if `password` matches the keystore checksum, else the reason."""
+    try:
+        crypto = keystore["crypto"]
+        checksum_function = crypto["checksum"].get("function")
+        key = derive_decryption_key(crypto["kdf"], normalize_password(password))
+        cipher_message = bytes.fromhex(crypto["cipher"]["message"])
+        expected = crypto["checksum"]["message"].lower()
+    except (KeyError, TypeError, ValueError, AttributeError) as exc:
+        return f"cannot verify password: {exc!r}"
+    if checksum_function != "sha256":
+        return f"unsupported checksum: {checksum_function}"
+    if hashlib.sha256(key[16:32] + cipher_message).hexdigest() != expected:
+        return "wrong password (checksum mismatch)"
+    return ""
+
+
+def _verify_job(job: Tuple[str, Dict, str]) -> Tuple[str, str]:
+    path, keystore, password = job
+    return path, verify_keystore_password(keystore, password)
+
+
+class VerifiedCache:
+    """
+    Lines of ``<uuid> <HMAC-SHA256(key, uuid, checksum, password)>`` that
+    already passed verification.
+
+    A plain hash of the password would let anyone holding the cache test
+    guesses at SHA-256 speed instead of paying the keystore's KDF, so the
+    digest is keyed with a random secret kept in ``<path>.key``. Both files
+    are created owner-readable only; without the key file the cache is
+    useless for guessing. Binding the keystore's checksum means a different
+    keystore reusing a uuid is verified again.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.key = self._load_key(path + ".key")
+        self.entries: Set[str] = set()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = {line.strip() for line in f if line.strip()}
+
+    @staticmethod
+    def _load_key(path: str) -> bytes:
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            with open(path, "rb") as f:
+                key = f.read()
+            if len(key) != 32:
+                raise ValueError(f"{path}: expected a 32-byte key")
+            return key
+        key = os.urandom(32)
+        with os.fdopen(fd, "wb") as f:
+            f.write(key)
+            f.flush()
+            os.fsync(f.fileno())
+        return key
+
+    def entry(self, keystore: Dict, password: str) -> str:
+        uuid = str(keystore.get("uuid", ""))
+        checksum = str(keystore["crypto"]["checksum"].get("message", ""))
+        digest = hmac.new(self.key, digestmod=hashlib.sha256)
+        for part in (uuid.encode(), checksum.lower().encode(), normalize_password(password)):
+            digest.update(len(part).to_bytes(4, "big") + part)
+        return f"{uuid} {digest.hexdigest()}"
+
+    def __contains__(self, entry: str) -> bool:
+        return entry in self.entries
+
+    def add_all(self, entries: List[str]) -> None:
+        new = [e for e in entries if e not in self.entries]
+        if not new:
+            return
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+        with os.fdopen(fd, "a", encoding="utf-8") as f:
+            f.write("".join(e + "\n" for e in new))
+            f.flush()
+            os.fsync(f.fileno())
+        self.entries.update(new)
+
+
+def load_password_map(path: str) -> Dict[str, str]:
+    """JSON object keyed by pubkey, uuid or keystore file name."""
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    if not isinstance(raw, dict):
+        raise ValueError("password map must be a JSON object")
+    return {_password_map_key(k): str(v) for k, v in raw.items()}
+
+
+def _password_map_key(key: str) -> str:
+    key = key.strip()
+    bare = key[2:] if key.lower().startswith("0x") else key
+    if len(bare) == 96 and all(c in string.hexdigits for c in bare):
+        return normalize_pubkey(key)
+    return key
+
+
+def read_password_file(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read().rstrip("\r\n")
+
+
+def verify_passwords(
+    paths: List[str],
+    password: Optional[str],
+    password_map: Optional[Dict[str, str]],
+    procs: int,
+    cache: Optional[VerifiedCache] = None,
+) -> List[Tuple[str, str]]:
+    """
+    Check every keystore's password; return (path, error) for failures.
+    Keystores found in `cache` are not re-derived.
+    """
+    bad: List[Tuple[str, str]] = []
+    jobs: List[Tuple[str, Dict, str]] = []
+    cache_keys: Dict[str, str] = {}
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                keystore = json.load(f)
+        except (OSError, ValueError) as exc:
+            bad.append((path, f"unable to read keystore: {exc}"))
+            continue
+        # --no-validate lets any JSON through; keep it a per-file failure.
+        if not isinstance(keystore, dict) or not isinstance(keystore.get("crypto"), dict) \
+                or not isinstance(keystore["crypto"].get("checksum"), dict):
+            bad.append((path, "not an EIP-2335 keystore: missing crypto.checksum object"))
+            continue
+        pw = password
+        if password_map is not None:
+            for key in (
+                normalize_pubkey(keystore.get("pubkey", "")),
+                keystore.get("uuid", ""),
+                os.path.basename(path),
+            ):
+                if key and key in password_map:
+                    pw = password_map[key]
+                    break
+        if pw is None:
+            bad.append((path, "no password for keystore"))
+            continue
+        if cache is not None:
+            entry = cache.entry(keystore, pw)
+            if entry in cache:
+                continue
+            cache_keys[path] = entry
+        jobs.append((path, keystore, pw))
+
+    if len(jobs) <= 1 or procs <= 1:
+        results = [_verify_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=procs) as pool:
+            results = list(pool.map(_verify_job, jobs))
+
+    bad.extend((path, err) for path, err in results if err)
+    if cache is not None:
+        cache.add_all([cache_keys[path] for path, err in results if not err])
+    return bad
+
+
+# ─────────────────────────── Upload journal ────────────────────────────
+class UploadJournal:
+    """
+    Append-only JSON lines record of upload attempts, keyed by pubkey.
+
+    Each line is flushed and fsync'd before the next upload result is
+    reported, so after a crash the journal holds every acknowledged answer.
+    A torn final line is ignored when the journal is loaded.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.committed: Set[str] = set()
+        self._lock = threading.Lock()
+        self._load()
+        self._fh = open(path, "a", encoding="utf-8")
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if (entry.get("status") in COMMITTED_STATUSES and entry.get("pubkey")
+                        and not entry.get("conflict")):
+                    self.committed.add(entry["pubkey"])
+
+    def is_committed(self, pubkey: str) -> bool:
+        return pubkey in self.committed
+
+    def record(self, res: UploadResult) -> None:
+        entry = {
+            "pubkey": res.pubkey,
+            "name": res.name,
+            "status": res.status,
+            "ts": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "path": res.path,
+        }
+        if res.conflict:
+            entry["conflict"] = res.conflict
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._fh.write(line)
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+            if res.committed and res.pubkey:
+                self.committed.add(res.pubkey)
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+# ───────────────────────── Server-side snapshot ─────────────────────────
+class ServerIndex:
+    """Names and pubkeys already present on the server, from one GET /validator."""
+
+    def __init__(self, entries: List[Dict]) -> None:
+        self.names: Dict[str, str] = {}  # name -> pubkey
+        self.pubkeys: Set[str] = set()
+        for entry in entries:
+            pubkey = normalize_pubkey(entry.get("pubkey"))
+            if entry.get("name"):
+                self.names[entry["name"]] = pubkey
+            if pubkey:
+                self.pubkeys.add(pubkey)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def existing(self, name: str, pubkey: str) -> str:
+        """Return why (name, pubkey) is already on the server, or ''."""
+        if pubkey and pubkey in self.pubkeys:
+            return "pubkey already on server"
+        return ""
+
+    def name_conflict(self, name: str, pubkey: str) -> str:
+        """Return why `name` is taken on the server by a different keystore, or ''."""
+        if name in self.names and (not pubkey or self.names[name] != pubkey):
+            return f"name already on server for pubkey {self.names[name] or 'unknown'}"
+        return ""
+
+
+def fetch_server_index(session: requests.Session, endpoint: str) -> ServerIndex:
+    resp = session.get(endpoint, timeout=TIMEOUT_SECS)
+    resp.raise_for_status()
+    # The launcher encodes an empty listing as JSON null.
+    return ServerIndex(resp.json() or [])
+
+
+# ───────────────────────── Adaptive concurrency ─────────────────────────
+class AdaptiveLimiter:
+    """
+    AIMD cap on in-flight POSTs, shared by all workers.
+
+    Every success adds 1/limit (about +1 per round of `limit` requests) while
+    the p95 of the last LATENCY_WINDOW latencies is under `target_p95`. A
+    timeout, connection error or 5xx halves the limit — at most once per
+    round, since only requests started after the last cut may trigger one.
+    """
+
+    def __init__(self, initial: int, maximum: int, target_p95: float) -> None:
+        self.maximum = max(maximum, 1)
+        self.limit = float(min(max(initial, 1), self.maximum))
+        self.target_p95 = target_p95
+        self.inflight = 0
+        self.decreases = 0
+        self._latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self._last_decrease = float("-inf")
+        self._cond = threading.Condition()
+
+    def acquire(self) -> float:
+        """Block until a slot is free; return the start time to pass to release()."""
+        with self._cond:
+            while self.inflight >= int(self.limit):
+                self._cond.wait()
+            self.inflight += 1
+            return time.monotonic()
+
+    def release(self, started: float, latency: float, overloaded: bool) -> None:
+        with self._cond:
+            self.inflight -= 1
+            if overloaded:
+                if started >= self._last_decrease:
+                    self.limit = max(self.limit / 2.0, 1.0)
+                    self._last_decrease = time.monotonic()
+                    self.decreases += 1
+            else:
+                self._latencies.append(latency)
+                p95 = percentile(sorted(self._latencies), 95)
+                if p95 <= self.target_p95:
+                    self.limit = min(self.limit + 1.0 / self.limit, float(self.maximum))
+            self._cond.notify_all()
+
+
+class RetryBudget:
+    """A run-wide allowance of retries, shared by all workers."""
+
+    def __init__(self, total: int) -> None:
+        self.remaining = total
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            self.used += 1
+            return True
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff."""
+    return random.uniform(0, min(BACKOFF_CAP_SECS, BACKOFF_BASE_SECS * (2 ** attempt)))
+
+
+# ───────────────────────────── HTTP helpers ─────────────────────────────
+def make_session(pool_size: int) -> requests.Session:
+    """Session whose connection pool can keep one socket alive per worker."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(pool_size, 1))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def upload_keystore(
+    session: requests.Session,
+    endpoint: str,
+    path: str,
+    name: str,
+    raw_keystore: bytes,
+    pubkey: str,
+    limiter: Optional[AdaptiveLimiter] = None,
+    budget: Optional[RetryBudget] = None,
+) -> UploadResult:
+    body = request_body(name, raw_keystore)
+    attempt = 0
+    while True:
+        started = limiter.acquire() if limiter else 0.0
+        start = time.perf_counter()
+        try:
+            resp = session.post(
+                endpoint, data=body, headers=JSON_HEADERS, timeout=TIMEOUT_SECS
+            )
+            status, detail = resp.status_code, resp.text.strip()
+        except requests.RequestException as exc:
+            status, detail = 0, f"request failed: {exc}"
+        elapsed = time.perf_counter() - start
+
+        overloaded = status == 0 or status >= 500
+        if limiter:
+            limiter.release(started, elapsed, overloaded)
+        if overloaded and budget and budget.take():
+            time.sleep(backoff_delay(attempt))
+            attempt += 1
+            continue
+        return UploadResult(
+            path, name, status, detail, pubkey, elapsed=elapsed, retries=attempt
+        )
+
+
+def name_conflict(session: requests.Session, endpoint: str, name: str, pubkey: str) -> str:
+    """
+    After a 409, return why the keystore under `name` is not this one, or ''.
+
+    The launcher refuses any POST whose name is taken, whichever key holds it,
+    so the 409 alone does not say this keystore is on the server.
+    """
+    if not pubkey:
+        return "name already taken on server; keystore has no pubkey to compare"
+    try:
+        resp = session.get(endpoint, params={"name": name}, timeout=TIMEOUT_SECS)
+        resp.raise_for_status()
+        held = normalize_pubkey(resp.json().get("pubkey"))
+    except (requests.RequestException, ValueError, AttributeError) as exc:
+        return f"name already taken on server; unable to read its pubkey: {exc}"
+    if held != pubkey:
+        return f"name already taken on server by pubkey {held or 'unknown'}"
+    return ""
+
+
+def _upload_path(
+    session: requests.Session,
+    endpoint: str,
+    template: str,
+    index: int,
+    path: str,
+    journal: Optional[UploadJournal],
+    server_index: Optional[ServerIndex],
+    limiter: Optional[AdaptiveLimiter] = None,
+    budget: Optional[RetryBudget] = None,
+) -> UploadResult:
+    try:
+        with open(path, "rb") as f:
+            raw = f.read().strip()
+        pubkey = raw_keystore_pubkey(raw)
+        name = validator_name(template, index, path, pubkey)
+    except (OSError, ValueError, KeyError) as exc:
+        return UploadResult(path, "", 0, f"unable to read keystore: {exc}")
+
+    if journal and journal.is_committed(pubkey):
+        return UploadResult(path, name, 0, "", pubkey, skipped="journal")
+    reason = server_index.existing(name, pubkey) if server_index else ""
+    if reason:
+        return UploadResult(path, name, 0, "", pubkey, skipped=reason)
+    conflict = server_index.name_conflict(name, pubkey) if server_index else ""
+    if conflict:
+        return UploadResult(path, name, 0, "", pubkey, conflict=conflict)
+
+    res = upload_keystore(session, endpoint, path, name, raw, pubkey, limiter, budget)
+    if res.status == 409:
+        res.conflict = name_conflict(session, endpoint, name, pubkey)
+    if journal:
+        journal.record(res)
+    return res
+
+
+def _preflight(session: requests.Session, endpoint: str) -> Optional[ServerIndex]:
+    try:
+        server_index = fetch_server_index(session, endpoint)
+    except (requests.RequestException, ValueError) as exc:
+        print(
+            f"WARNING: preflight GET /validator failed, uploading without it: {exc}",
+            file=sys.stderr,
+        )
+        return None
+    print(f"Preflight: {len(server_index)} validators already on server")
+    return server_index
+
+
+def _report(res: UploadResult) -> None:
+    if res.skipped:
+        print(f"skipped   {res.name} ({res.path}): {res.skipped}")
+    elif res.conflict:
+        print(f"FAILED    {res.name} ({res.path}): {res.conflict}", file=sys.stderr)
+    elif res.status == 201:
+        print(f"created   {res.name} ({res.path})")
+    elif res.status == 409:
+        print(f"conflict  {res.name} ({res.path})")
+    else:
+        print(
+            f"FAILED    {res.name or '-'} ({res.path}): "
+            f"{res.status or 'no response'} {res.detail}",
+            file=sys.stderr,
+        )
+
+
+def bulk_upload(
+    paths: Iterable[str],
+    endpoint: str,
+    template: str,
+    workers: int,
+    journal: Optional[UploadJournal] = None,
+    preflight: bool = True,
+    limiter: Optional[AdaptiveLimiter] = None,
+    budget: Optional[RetryBudget] = None,
+) -> List[UploadResult]:
+    with make_session(workers) as session, ThreadPoolExecutor(max_workers=workers) as pool:
+        server_index = _preflight(session, endpoint) if preflight else None
+        futures = [
+            pool.submit(
+                _upload_path, session, endpoint, template, i, path, journal,
+                server_index, limiter, budget,
+            )
+            for i, path in enumerate(paths)
+        ]
+        results = []
+        for fut in futures:
+            res = fut.result()
+            _report(res)
+            results.append(res)
+    return results
+
+
+# ──────────────────────────── asyncio engine ────────────────────────────
+async def _async_bulk_upload(
+    paths: Iterable[str],
+    endpoint: str,
+    template: str,
+    concurrency: int,
+    journal: Optional[UploadJournal],
+    preflight: bool,
+    limiter: Optional[AdaptiveLimiter],
+    budget: Optional[RetryBudget],
+) -> List[UploadResult]:
+    # requests is blocking, so each POST runs on an executor thread; the
+    # semaphore (not the executor) is what bounds the in-flight requests.
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=concurrency))
+    slots = asyncio.Semaphore(concurrency)
+    results: List[UploadResult] = []
+
+    with make_session(concurrency) as session:
+        server_index = (
+            await asyncio.to_thread(_preflight, session, endpoint) if preflight else None
+        )
+
+        async def upload(index: int, path: str) -> None:
+            try:
+                res = await asyncio.to_thread(
+                    _upload_path, session, endpoint, template, index, path,
+                    journal, server_index, limiter, budget,
+                )
+            finally:
+                slots.release()
+            _report(res)
+            results.append(res)
+
+        pending: Set[asyncio.Task] = set()
+        for index, path in enumerate(paths):
+            # Backpressure: a keystore is only pulled from the generator (and
+            # read from disk) once a slot is free.
+            await slots.acquire()
+            task = asyncio.create_task(upload(index, path))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        await asyncio.gather(*pending)
+    return results
+
+
+def async_bulk_upload(
+    paths: Iterable[str],
+    endpoint: str,
+    template: str,
+    concurrency: int,
+    journal: Optional[UploadJournal] = None,
+    preflight: bool = True,
+    limiter: Optional[AdaptiveLimiter] = None,
+    budget: Optional[RetryBudget] = None,
+) -> List[UploadResult]:
+    return asyncio.run(
+        _async_bulk_upload(
+            paths, endpoint, template, concurrency, journal, preflight, limiter, budget
+        )
+    )
+
+
+# ─────────────────────────────── Reporting ──────────────────────────────
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def print_summary(results: List[UploadResult], wall_secs: float = 0.0) -> int:
+    """Print created/conflicted/failed counts; return the number of failures."""
+    skipped = sum(1 for r in results if r.skipped)
+    created = sum(1 for r in results if not r.skipped and r.status == 201)
+    conflicted = sum(1 for r in results if r.committed and r.status == 409)
+    failed = len(results) - skipped - created - conflicted
+    print(
+        f"\nSummary: {len(results)} keystores — "
+        f"{created} created, {conflicted} conflicted (409), {failed} failed, "
+        f"{skipped} skipped"
+    )
+
+    latencies = sorted(r.elapsed for r in results if r.elapsed > 0)
+    if latencies and wall_secs > 0:
+        print(
+            f"Latency: p50 {percentile(latencies, 50) * 1000:.1f} ms, "
+            f"p95 {percentile(latencies, 95) * 1000:.1f} ms, "
+            f"max {latencies[-1] * 1000:.1f} ms over {len(latencies)} requests"
+        )
+        print(
+            f"Throughput: {len(latencies) / wall_secs:.1f} requests/s "
+            f"({wall_secs:.2f} s wall)"
+        )
+    retries = sum(r.retries for r in results)
+    if retries:
+        print(f"Retries: {retries}")
+    return failed
+
+
+# ────────────────────────────────── main ─────────────────────────────────
+def run_bulk(args: argparse.Namespace, endpoint: str) -> None:
+    paths = discover_keystores(args.keystore_path)
+    if not paths:
+        print("ERROR: No keystore files found", file=sys.stderr)
+        sys.exit(1)
+    if args.workers < 1:
+        print("ERROR: --workers must be at least 1", file=sys.stderr)
+        sys.exit(1)
+
+    if not args.no_validate:
+        start = time.perf_counter()
+        bad = validate_keystores(paths, args.validate_procs or os.cpu_count() or 1)
+        if bad:
+            print(
+                f"ERROR: {len(bad)} of {len(paths)} keystores failed EIP-2335 "
+                "validation; nothing was uploaded:",
+                file=sys.stderr,
+            )
+            for path, err in bad:
+                print(f"  {path}: {err}", file=sys.stderr)
+            sys.exit(1)
+        print(
+            f"Validated {len(paths)} keystores in {time.perf_counter() - start:.2f} s"
+        )
+
+    if args.password_file or args.password_map:
+        start = time.perf_counter()
+        try:
+            password = read_password_file(args.password_file) if args.password_file else None
+            password_map = load_password_map(args.password_map) if args.password_map else None
+            cache = VerifiedCache(args.verify_cache) if args.verify_cache else None
+        except (OSError, ValueError) as exc:
+            print(f"ERROR: Unable to read passwords: {exc}", file=sys.stderr)
+            sys.exit(1)
+        bad = verify_passwords(
+            paths, password, password_map,
+            args.validate_procs or os.cpu_count() or 1, cache,
+        )
+        if bad:
+            print(
+                f"ERROR: {len(bad)} of {len(paths)} keystores failed password "
+                "verification; nothing was uploaded:",
+                file=sys.stderr,
+            )
+            for path, err in bad:
+                print(f"  {path}: {err}", file=sys.stderr)
+            sys.exit(1)
+        print(
+            f"Verified passwords for {len(paths)} keystores in "
+            f"{time.perf_counter() - start:.2f} s"
+        )
+
+    bad = check_names(paths, args.name_template)
+    if bad:
+        print(
+            f"ERROR: {len(bad)} of {len(paths)} keystores have no usable unique "
+            f"name under --name-template {args.name_template!r}; nothing was uploaded:",
+            file=sys.stderr,
+        )
+        for path, err in bad:
+            print(f"  {path}: {err}", file=sys.stderr)
+        sys.exit(1)
+
+    upload = async_bulk_upload if args.engine == "asyncio" else bulk_upload
+    journal = UploadJournal(args.journal) if args.journal else None
+    limiter = None
+    if args.adaptive:
+        limiter = AdaptiveLimiter(
+            max(1, args.workers // 4), args.workers, args.target_p95_ms / 1000.0
+        )
+    budget = RetryBudget(args.retry_budget) if args.retry_budget > 0 else None
+    start = time.perf_counter()
+    try:
+        results = upload(
+            iter(paths), endpoint, args.name_template, args.workers, journal,
+            preflight=not args.no_preflight, limiter=limiter, budget=budget,
+        )
+    finally:
+        if journal:
+            journal.close()
+    failed = print_summary(results, time.perf_counter() - start)
+    if limiter:
+        print(
+            f"Adaptive concurrency: final limit {int(limiter.limit)} of "
+            f"{limiter.maximum}, {limiter.decreases} decreases"
+        )
+    if failed:
+        sys.exit(1)
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Upload validator keystore")
-    parser.add_argument("keystore_path", help="Path to voting-keystore.json")
+    parser.add_argument(
+        "keystore_path",
+        nargs="+",
+        help="Path to voting-keystore.json, or keystore files/directories/globs for bulk upload",
+    )
     parser.add_argument(
         "-n", "--name", default="V0", help='Validator name (default: "V0")'
     )
@@ -40,11 +1015,81 @@ def main() -> None:
         default="http://localhost:5000",
         help='Server URL prefix (default: "http://localhost:5000")',
     )
+    parser.add_argument(
+        "--name-template",
+        default="{pubkey}",
+        help='Bulk mode validator name; fields {index}, {stem}, {parent}, {pubkey} '
+             '(default: "{pubkey}")',
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=8,
+        help="Bulk mode concurrent uploads (default: 8)",
+    )
+    parser.add_argument(
+        "--journal",
+        help="Bulk mode append-only upload journal; committed pubkeys are skipped on rerun",
+    )
+    parser.add_argument(
+        "--no-preflight",
+        action="store_true",
+        help="Bulk mode: do not fetch GET /validator to drop keystores already on the server",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=("threads", "asyncio"),
+        default="threads",
+        help="Bulk mode upload engine (default: threads)",
+    )
+    parser.add_argument(
+        "--validate-procs", type=int, default=0,
+        help="Bulk mode processes for local EIP-2335 validation (default: CPU count)",
+    )
+    parser.add_argument(
+        "--no-validate",
+        action="store_true",
+        help="Bulk mode: upload without validating keystores locally first",
+    )
+    pw_group = parser.add_mutually_exclusive_group()
+    pw_group.add_argument(
+        "--password-file",
+        help="Bulk mode: verify every keystore decrypts with the password in this file",
+    )
+    pw_group.add_argument(
+        "--password-map",
+        help="Bulk mode: JSON object mapping pubkey, uuid or file name to password",
+    )
+    parser.add_argument(
+        "--verify-cache",
+        help="Bulk mode: file of verified (uuid, keyed password digest) pairs to skip "
+             "on rerun; the key is kept in <file>.key",
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Bulk mode: adapt concurrency (AIMD) up to --workers",
+    )
+    parser.add_argument(
+        "--target-p95-ms", type=float, default=1000.0,
+        help="Bulk mode: p95 POST latency under which --adaptive grows concurrency "
+             "(default: 1000)",
+    )
+    parser.add_argument(
+        "--retry-budget", type=int, default=0,
+        help="Bulk mode: total retries allowed for timeouts/5xx across the run (default: 0)",
+    )
     args = parser.parse_args()
 
+    endpoint = args.url.rstrip("/") + "/validator"
+
+    if is_bulk_request(args.keystore_path):
+        run_bulk(args, endpoint)
+        return
+
+    keystore_path = args.keystore_path[0]
+
     # Load keystore JSON
     try:
-        with open(args.keystore_path, "r", encoding="utf-8") as f:
+        with open(keystore_path, "r", encoding="utf-8") as f:
             keystore_data = json.load(f)
     except Exception as exc:
         print(f"ERROR: Unable to read keystore file: {exc}", file=sys.stderr)
@@ -56,10 +1101,8 @@ def main() -> None:
         "keystore": keystore_data,
     }
 
-    endpoint = args.url.rstrip("/") + "/validator"
-
     try:
-        resp = requests.post(endpoint, json=payload, timeout=10)
+        resp = requests.post(endpoint, json=payload, timeout=TIMEOUT_SECS)
     except requests.RequestException as exc:
         print(f"ERROR: Request failed: {exc}", file=sys.stderr)
         sys.exit(1)
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+bench_add_validator.py — Throughput benchmark for add_validator.py bulk uploads.
+
+Starts an in-process stand-in for the lighthouse-launch ``/validator``
+endpoint (POST and GET), generates N synthetic EIP-2335 keystores, and runs
+the bulk uploader in sequential, threaded and asyncio modes against it. For
+each mode it records keys/s, p50/p95/p99 request latency and RSS, and writes
+the results as JSON so runs can be compared over time. Each mode runs in a
+freshly spawned process, so its peak RSS is its own rather than the highest
+of every mode run before it.
+
+The stand-in can inject per-request latency, a 409 rate and a 5xx rate.
+
+Examples
+--------
+# 2000 keys, 5 ms server latency, results to stdout
+python bench_add_validator.py -N 2000 --latency-ms 5
+
+# Simulate a re-import with 20% duplicates and 1% server errors
+python bench_add_validator.py -N 5000 --conflict-rate 0.2 --error-rate 0.01 \\
+    --workers 32 -o bench-results.json
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import socket
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+import add_validator
+
+MODES = ("sequential", "threaded", "asyncio")
+BENCH_PASSWORD = b"bench-password"
+
+
+# ─────────────────────────── Launcher stand-in ──────────────────────────
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency: float, conflict_rate: float, error_rate: float) -> None:
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.latency = latency
+        self.conflict_rate = conflict_rate
+        self.error_rate = error_rate
+        self.validators: Dict[str, str] = {}
+        self.lock = threading.Lock()
+        self.rng = random.Random(0)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def reset(self) -> None:
+        with self.lock:
+            self.validators.clear()
+            self.rng.seed(0)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: StandInServer
+
+    def setup(self) -> None:
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002
+        pass
+
+    def _send(self, status: int, body: str, ctype: str = "text/plain") -> None:
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:  # noqa: N802
+        url = urllib.parse.urlsplit(self.path)
+        if url.path != "/validator":
+            self._send(404, "Not Found")
+            return
+        name = urllib.parse.parse_qs(url.query).get("name", [""])[0]
+        with self.server.lock:
+            if name:
+                pubkey = self.server.validators.get(name)
+            else:
+                listing = [{"name": n, "pubkey": p} for n, p in self.server.validators.items()]
+        if not name:
+            self._send(200, json.dumps(listing or None), "application/json")
+        elif pubkey is None:
+            self._send(404, "Validator keystore not found")
+        else:
+            self._send(200, json.dumps({"name": name, "pubkey": pubkey}), "application/json")
+
+    def do_POST(self) -> None:  # noqa: N802
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            req = json.loads(self.rfile.read(length))
+            name, pubkey = req["name"], req["keystore"].get("pubkey", "")
+        except (ValueError, KeyError, AttributeError) as exc:
+            self._send(400, f"Invalid request: {exc}")
+            return
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        with self.server.lock:
+            roll = self.server.rng.random()
+            if roll < self.server.error_rate:
+                status = 500
+            elif name in self.server.validators or roll < self.server.error_rate + self.server.conflict_rate:
+                status = 409
+            else:
+                self.server.validators[name] = pubkey
+                status = 201
+        messages = {
+            201: "Validator keystore created",
+            409: "Validator keystore already exists",
+            500: "error writing file: injected failure",
+        }
+        self._send(status, messages[status])
+
+
+# ─────────────────────────── Synthetic keystores ────────────────────────
+def write_keystores(directory: str, count: int) -> List[str]:
+    """Write `count` valid pbkdf2 keystores (cheap KDF params) into `directory`."""
+    salt = os.urandom(32)
+    iterations = 2
+    key = hashlib.pbkdf2_hmac("sha256", BENCH_PASSWORD, salt, iterations, 32)
+    paths = []
+    for i in range(count):
+        cipher_message = os.urandom(32)
+        keystore = {
+            "crypto": {
+                "kdf": {
+                    "function": "pbkdf2",
+                    "params": {"dklen": 32, "c": iterations, "prf": "hmac-sha256", "salt": salt.hex()},
+                    "message": "",
+                },
+                "checksum": {
+                    "function": "sha256",
+                    "params": {},
+                    "message": hashlib.sha256(key[16:32] + cipher_message).hexdigest(),
+                },
+                "cipher": {
+                    "function": "aes-128-ctr",
+                    "params": {"iv": os.urandom(16).hex()},
+                    "message": cipher_message.hex(),
+                },
+            },
+            "description": "bench",
+            "pubkey": os.urandom(48).hex(),
+            "path": f"m/12381/3600/{i}/0/0",
+            "uuid": str(uuid.uuid4()),
+            "version": 4,
+        }
+        path = os.path.join(directory, f"keystore-m_12381_3600_{i}_0_0-{i}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(keystore, f)
+        paths.append(path)
+    return paths
+
+
+# ───────────────────────────────── Runner ───────────────────────────────
+def current_rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def peak_rss_bytes() -> int:
+    """Peak RSS of this process over its whole lifetime; see run_mode_isolated."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_mode(mode: str, paths: List[str], url: str, workers: int) -> Dict:
+    endpoint = url + "/validator"
+    upload = add_validator.async_bulk_upload if mode == "asyncio" else add_validator.bulk_upload
+    concurrency = 1 if mode == "sequential" else workers
+
+    rss_before = current_rss_bytes()
+    sink = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(sink), contextlib.redirect_stderr(sink):
+        results = upload(iter(paths), endpoint, "{pubkey}", concurrency, None, preflight=False)
+    wall = time.perf_counter() - start
+
+    latencies = sorted(r.elapsed for r in results if r.elapsed > 0)
+    statuses: Dict[str, int] = {}
+    for r in results:
+        key = str(r.status) if r.status else "no_response"
+        statuses[key] = statuses.get(key, 0) + 1
+    pct = add_validator.percentile
+    return {
+        "mode": mode,
+        "concurrency": concurrency,
+        "keys": len(results),
+        "wall_s": round(wall, 4),
+        "keys_per_s": round(len(results) / wall, 2) if wall else 0.0,
+        "latency_ms": {
+            "p50": round(pct(latencies, 50) * 1000, 3),
+            "p95": round(pct(latencies, 95) * 1000, 3),
+            "p99": round(pct(latencies, 99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        },
+        "statuses": statuses,
+        "committed": sum(1 for r in results if r.committed),
+        "conflicts": sum(1 for r in results if r.conflict),
+        "rss_bytes": {
+            "before": rss_before,
+            "after": current_rss_bytes(),
+            "peak": peak_rss_bytes(),
+        },
+    }
+
+
+def run_mode_isolated(mode: str, paths: List[str], url: str, workers: int) -> Dict:
+    """Run one mode in a new spawned interpreter and return its results."""
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+        return pool.submit(run_mode, mode, paths, url, workers).result()
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Benchmark add_validator.py bulk upload modes")
+    p.add_argument("-N", "--keys", type=int, default=1000, help="Synthetic keystores (default: 1000)")
+    p.add_argument("-w", "--workers", type=int, default=16,
+                   help="Concurrency for threaded/asyncio modes (default: 16)")
+    p.add_argument("--latency-ms", type=float, default=0.0,
+                   help="Stand-in server latency per POST in ms (default: 0)")
+    p.add_argument("--conflict-rate", type=float, default=0.0,
+                   help="Fraction of POSTs answered 409 without storing the key, so the "
+                        "GET /validator?name= check reports a conflict (default: 0)")
+    p.add_argument("--error-rate", type=float, default=0.0,
+                   help="Fraction of POSTs answered 500 (default: 0)")
+    p.add_argument("--modes", default=",".join(MODES),
+                   help="Comma-separated modes to run (default: %(default)s)")
+    p.add_argument("-o", "--output", help="Write JSON results here (default: stdout)")
+    args = p.parse_args()
+
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    unknown = [m for m in modes if m not in MODES]
+    if unknown or args.keys < 1 or args.workers < 1:
+        p.error(f"invalid modes {unknown}" if unknown else "--keys and --workers must be >= 1")
+
+    server = StandInServer(args.latency_ms / 1000.0, args.conflict_rate, args.error_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        with tempfile.TemporaryDirectory(prefix="bench-keystores-") as tmp:
+            paths = write_keystores(tmp, args.keys)
+            runs = []
+            for mode in modes:
+                server.reset()
+                run = run_mode_isolated(mode, paths, server.url, args.workers)
+                print(
+                    f"{mode:<10} {run['keys_per_s']:>9.1f} keys/s  "
+                    f"p50 {run['latency_ms']['p50']:.2f} ms  "
+                    f"p99 {run['latency_ms']['p99']:.2f} ms",
+                    file=sys.stderr,
+                )
+                runs.append(run)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "host": platform.node(),
+        "cpus": os.cpu_count(),
+        "params": {
+            "keys": args.keys,
+            "workers": args.workers,
+            "latency_ms": args.latency_ms,
+            "conflict_rate": args.conflict_rate,
+            "error_rate": args.error_rate,
+        },
+        "runs": runs,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+bench_genpw.py — Microbenchmark for genpw.py password generation.
+
+Compares passwords/s of the per-character generator (generate_password, one
+secrets.choice per character plus a shuffle) with the bulk generator
+(generate_passwords, one os.urandom read mapped with bytes.translate) for a
+few password lengths, and writes the results as JSON.
+
+Examples
+--------
+# Default: 20000 passwords at lengths 12, 24 and 64
+python bench_genpw.py
+
+# Keystore-sized batch, best of 5 repeats, results to a file
+python bench_genpw.py -N 500 --lengths 32 --repeat 5 -o genpw-bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+import genpw
+
+
+def best_of(repeat: int, fn: Callable[[], List[str]]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_length(count: int, length: int, repeat: int) -> Dict:
+    per_char = best_of(repeat, lambda: [genpw.generate_password(length) for _ in range(count)])
+    bulk = best_of(repeat, lambda: genpw.generate_passwords(count, length))
+    return {
+        "length": length,
+        "passwords": count,
+        "generate_password": {"wall_s": round(per_char, 6), "passwords_per_s": round(count / per_char, 1)},
+        "generate_passwords": {"wall_s": round(bulk, 6), "passwords_per_s": round(count / bulk, 1)},
+        "speedup": round(per_char / bulk, 2),
+    }
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Benchmark genpw.py password generators")
+    p.add_argument("-N", "--count", type=int, default=20000, help="Passwords per run (default: 20000)")
+    p.add_argument("--lengths", default="12,24,64", help="Comma-separated lengths (default: %(default)s)")
+    p.add_argument("--repeat", type=int, default=3, help="Take the best of this many runs (default: 3)")
+    p.add_argument("-o", "--output", help="Write JSON results here (default: stdout)")
+    args = p.parse_args()
+
+    try:
+        lengths = [int(x) for x in args.lengths.split(",") if x.strip()]
+    except ValueError:
+        p.error("--lengths must be comma-separated integers")
+    if args.count < 1 or args.repeat < 1 or not lengths or min(lengths) < 3:
+        p.error("--count and --repeat must be >= 1 and every length >= 3")
+
+    runs = []
+    for length in lengths:
+        run = run_length(args.count, length, args.repeat)
+        print(
+            f"len {length:>3}  per-char {run['generate_password']['passwords_per_s']:>10.0f}/s  "
+            f"bulk {run['generate_passwords']['passwords_per_s']:>10.0f}/s  x{run['speedup']}",
+            file=sys.stderr,
+        )
+        runs.append(run)
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "host": platform.node(),
+        "cpus": os.cpu_count(),
+        "params": {"count": args.count, "lengths": lengths, "repeat": args.repeat},
+        "runs": runs,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
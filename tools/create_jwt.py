@@ -4,127 +4,291 @@
 """
 A script to manage a Kubernetes secret for an execution target.
 
-This module generates a 32-byte hexadecimal secret using OpenSSL and creates a Kubernetes
-secret with the token name `jwt.hex`. If the secret already exists, it can be optionally
-regenerated using the --force flag. This secret is intended for use as an execution target
-secret between geth and lighthouse.
+This module generates a 32-byte hexadecimal secret from the Python CSPRNG and creates a
+Kubernetes secret with the token name `jwt.hex`. If the secret already exists, it can be
+optionally regenerated using the --force flag, which replaces it in place (guarded by its
+resourceVersion) rather than deleting and recreating it. This secret is intended for use as
+an execution target secret between geth and lighthouse.
+
+All API calls go through one in-process Kubernetes client; neither kubectl nor openssl is
+needed. To rotate the secret of a running release, use rotate_jwt.py, which also restarts
+geth and the beacon node together in a gap between validator duties.
+
+Many secrets can be provisioned in one run, concurrently over the shared client, either from
+explicit NAMESPACE/NAME targets or from every Helm-deployed StatefulSet matching a label
+selector that mounts an `auth-jwt` volume (geth and lighthouse beacon in the eth-validator
+chart). Each target gets its own token and its own reported outcome.
 
 Usage:
     ./scriptname.py [--force] [--name SECRET_NAME] [--namespace NAMESPACE]
+    ./scriptname.py [--force] --target NAMESPACE/NAME [--target ...] [--targets-file FILE]
+    ./scriptname.py [--force] --selector app.kubernetes.io/managed-by=Helm [--all-namespaces]
 """
 
 import argparse
-import subprocess
+import secrets
 import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from kubernetes import client, config
+from kubernetes.client.exceptions import ApiException
+from urllib3.exceptions import HTTPError as TransportError
+
+JWT_KEY = "jwt.hex"
+JWT_VOLUME = "auth-jwt"
+REPLACE_ATTEMPTS = 3
+
 
 def generate_secret():
     """
-    Generate a 32-byte hexadecimal secret using OpenSSL.
+    Generate a 32-byte hexadecimal secret.
+
+    Returns:
+        str: A 32-byte secret as 64 hexadecimal characters.
+    """
+    return secrets.token_hex(32)
+
+
+def load_kube_api(workers=1):
+    """
+    Build a CoreV1Api client, parsing the cluster configuration once.
+
+    In-cluster service-account configuration is tried first, then the local kubeconfig.
 
-    This function runs the OpenSSL command to produce a 32-byte secret in hexadecimal format.
+    Args:
+        workers (int): Threads that will share the client; the connection pool is sized to match.
 
     Returns:
-        str: A 32-byte hexadecimal secret.
+        client.CoreV1Api: The API client.
 
     Raises:
-        SystemExit: Exits if the OpenSSL command fails.
+        SystemExit: Exits if no configuration can be loaded.
     """
     try:
-        result = subprocess.run(
-            ['openssl', 'rand', '-hex', '32'],
-            check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
-        )
-        secret = result.stdout.decode('utf-8').strip()
-        return secret
-    except subprocess.CalledProcessError as e:
-        print(f"Error generating secret using openssl: {e.stderr.decode('utf-8').strip()}")
-        sys.exit(1)
-    except Exception as e:
-        print(f"Unexpected error generating secret: {e}")
-        sys.exit(1)
+        config.load_incluster_config()
+    except config.ConfigException:
+        try:
+            config.load_kube_config()
+        except Exception as e:
+            print(f"Error loading Kubernetes configuration: {e}")
+            sys.exit(1)
+    cfg = client.Configuration.get_default_copy()
+    cfg.connection_pool_maxsize = max(workers, cfg.connection_pool_maxsize or 1)
+    return client.CoreV1Api(client.ApiClient(cfg))
+
+
+def secret_body(secret_name, secret, resource_version=None):
+    """
+    Build the Secret object holding the token under `jwt.hex`.
+
+    Args:
+        secret_name (str): The name of the Kubernetes secret.
+        secret (str): The secret token to store.
+        resource_version (str, optional): Guard for a replace; the API server rejects the
+            write with 409 if the Secret changed since this version was read.
+
+    Returns:
+        client.V1Secret: The Secret body.
+    """
+    return client.V1Secret(
+        metadata=client.V1ObjectMeta(name=secret_name, resource_version=resource_version),
+        type="Opaque",
+        string_data={JWT_KEY: secret},
+    )
+
 
-def check_secret_exists(secret_name, namespace):
+def ensure_secret(api, secret_name, namespace, secret, force):
     """
-    Check if a Kubernetes secret exists.
+    Create the secret, or replace it in place when it exists and `force` is set.
 
-    This function uses kubectl to determine whether a secret with the specified name
-    exists in the given namespace.
+    The create is attempted first, so a new secret costs a single request. An existing one is
+    only replaced with `force`: its current resourceVersion is read and sent with the replace,
+    and the read-replace pair is retried if another writer got in between. The Secret never
+    disappears, so pods mounting it never see it missing.
 
     Args:
+        api (client.CoreV1Api): The API client.
         secret_name (str): The name of the Kubernetes secret.
-        namespace (str): The Kubernetes namespace to check.
+        namespace (str): The Kubernetes namespace of the secret.
+        secret (str): The secret token to store.
+        force (bool): Replace an existing secret.
 
     Returns:
-        bool: True if the secret exists, False otherwise.
+        str: 'created', 'replaced' or 'exists'.
 
     Raises:
-        SystemExit: Exits if there is an error checking the secret.
+        ApiException: On API errors other than the handled conflicts.
     """
     try:
-        result = subprocess.run(
-            ['kubectl', 'get', 'secret', secret_name, '-n', namespace],
-            stdout=subprocess.PIPE, stderr=subprocess.PIPE
-        )
-        return result.returncode == 0
-    except Exception as e:
-        print(f"Error checking secret existence: {e}")
-        sys.exit(1)
+        api.create_namespaced_secret(namespace, secret_body(secret_name, secret))
+        return "created"
+    except ApiException as e:
+        if e.status != 409:
+            raise
+    if not force:
+        return "exists"
 
-def delete_secret(secret_name, namespace):
-    """
-    Delete the Kubernetes secret.
+    for attempt in range(REPLACE_ATTEMPTS):
+        try:
+            current = api.read_namespaced_secret(secret_name, namespace)
+            body = secret_body(secret_name, secret, current.metadata.resource_version)
+            api.replace_namespaced_secret(secret_name, namespace, body)
+            return "replaced"
+        except ApiException as e:
+            if e.status == 404:  # deleted since the create attempt
+                api.create_namespaced_secret(namespace, secret_body(secret_name, secret))
+                return "created"
+            if e.status != 409 or attempt == REPLACE_ATTEMPTS - 1:
+                raise
 
-    This function uses kubectl to delete the specified secret from the given namespace.
+
+def parse_target(text):
+    """
+    Parse a NAMESPACE/NAME target.
 
     Args:
-        secret_name (str): The name of the Kubernetes secret to delete.
-        namespace (str): The Kubernetes namespace where the secret resides.
+        text (str): The target, e.g. 'mainnet/shard0-eth-validator-auth-jwt'.
+
+    Returns:
+        tuple: (namespace, name).
 
     Raises:
-        SystemExit: Exits if there is an error deleting the secret.
+        ValueError: If the text is not of the form NAMESPACE/NAME.
     """
-    try:
-        result = subprocess.run(
-            ['kubectl', 'delete', 'secret', secret_name, '-n', namespace],
-            check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
-        )
-        print(result.stdout.decode('utf-8').strip())
-    except subprocess.CalledProcessError as e:
-        print(f"Error deleting secret: {e.stderr.decode('utf-8').strip()}")
-        sys.exit(1)
+    namespace, sep, name = text.strip().partition("/")
+    if not sep or not namespace or not name or "/" in name:
+        raise ValueError(f"expected NAMESPACE/NAME, got {text.strip()!r}")
+    return namespace, name
+
 
-def create_secret(secret_name, namespace, secret):
+def read_targets_file(path):
     """
-    Create a new Kubernetes secret with the given secret value.
+    Read NAMESPACE/NAME targets, one per line; blank lines and '#' comments are ignored.
 
-    This function uses kubectl to create a new secret in the specified namespace.
-    The secret is stored with a token name `jwt.hex` rather than `jwt`.
+    Args:
+        path (str): The file to read.
+
+    Returns:
+        list: (namespace, name) tuples.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        lines = [line.split("#", 1)[0].strip() for line in f]
+    return [parse_target(line) for line in lines if line]
+
+
+def discover_targets(api, selector, namespace=None):
+    """
+    Find the JWT secrets referenced by StatefulSets matching a label selector.
+
+    The secret name is taken from each pod template's `auth-jwt` volume, so chart name
+    overrides and `externalNode.jwtSecretName` are honoured without re-deriving them.
 
     Args:
-        secret_name (str): The name of the Kubernetes secret to create.
-        namespace (str): The Kubernetes namespace where the secret will be created.
-        secret (str): The secret token to store.
+        api (client.CoreV1Api): The API client; its connection is shared with the apps API.
+        selector (str): Label selector, e.g. 'app.kubernetes.io/instance=mainnet'.
+        namespace (str, optional): Restrict to this namespace; all namespaces when None.
+
+    Returns:
+        list: Unique (namespace, name) tuples, in discovery order.
+    """
+    apps = client.AppsV1Api(api.api_client)
+    if namespace:
+        sets = apps.list_namespaced_stateful_set(namespace, label_selector=selector).items
+    else:
+        sets = apps.list_stateful_set_for_all_namespaces(label_selector=selector).items
+    targets = []
+    for sts in sets:
+        for volume in sts.spec.template.spec.volumes or []:
+            if volume.name == JWT_VOLUME and volume.secret and volume.secret.secret_name:
+                target = (sts.metadata.namespace, volume.secret.secret_name)
+                if target not in targets:
+                    targets.append(target)
+    return targets
+
+
+def provision_secrets(api, targets, force, workers):
+    """
+    Ensure a JWT secret for every target concurrently, each with its own fresh token.
+
+    Args:
+        api (client.CoreV1Api): The shared API client.
+        targets (list): (namespace, name) tuples.
+        force (bool): Replace existing secrets.
+        workers (int): Maximum concurrent targets.
+
+    Returns:
+        list: (namespace, name, outcome, detail) tuples in target order, where outcome is
+        'created', 'replaced', 'exists' or 'failed'.
+    """
+    def one(target):
+        namespace, name = target
+        try:
+            return namespace, name, ensure_secret(api, name, namespace, generate_secret(), force), ""
+        except ApiException as e:
+            return namespace, name, "failed", f"{e.status} {e.reason}"
+        except (TransportError, OSError) as e:  # no answer from the API server
+            return namespace, name, "failed", str(e)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(one, targets))
+
+
+def provision_many(args, parser):
+    """
+    Multi-target mode: collect targets, provision them and print per-target outcomes.
+
+    Args:
+        args (argparse.Namespace): Parsed arguments.
+        parser (argparse.ArgumentParser): For reporting usage errors.
 
     Raises:
-        SystemExit: Exits if there is an error creating the secret.
+        SystemExit: Exits 1 if any target failed.
     """
+    targets = []
     try:
-        result = subprocess.run(
-            ['kubectl', 'create', 'secret', 'generic', secret_name,
-             '--from-literal=jwt.hex=' + secret, '-n', namespace],
-            check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
-        )
-        print(result.stdout.decode('utf-8').strip())
-    except subprocess.CalledProcessError as e:
-        print(f"Error creating secret: {e.stderr.decode('utf-8').strip()}")
+        targets += [parse_target(t) for t in args.target or []]
+        if args.targets_file:
+            targets += read_targets_file(args.targets_file)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    api = load_kube_api(args.workers)
+    if args.selector:
+        try:
+            found = discover_targets(api, args.selector, None if args.all_namespaces else args.namespace)
+        except ApiException as e:
+            print(f"Error listing StatefulSets for selector '{args.selector}': {e.status} {e.reason}")
+            sys.exit(1)
+        except (TransportError, OSError) as e:
+            print(f"Error listing StatefulSets for selector '{args.selector}': {e}")
+            sys.exit(1)
+        print(f"Selector '{args.selector}' matched {len(found)} JWT secret(s).")
+        targets += found
+    targets = list(dict.fromkeys(targets))
+    if not targets:
+        print("No targets to provision.")
+        return
+
+    results = provision_secrets(api, targets, args.force, args.workers)
+    width = max(len(f"{ns}/{name}") for ns, name, _, _ in results)
+    for namespace, name, outcome, detail in results:
+        print(f"  {namespace + '/' + name:<{width}}  {outcome}{'  ' + detail if detail else ''}")
+    counts = Counter(outcome for _, _, outcome, _ in results)
+    print(", ".join(f"{counts[k]} {k}" for k in ("created", "replaced", "exists", "failed")))
+    if counts["exists"] and not args.force:
+        print("Existing secrets were kept. Use --force to regenerate them.")
+    if counts["failed"]:
         sys.exit(1)
 
+
 def main():
     """
     Main entry point of the script.
 
-    Parses command-line arguments, checks for the existence of the specified Kubernetes secret,
-    optionally forces deletion, generates a new secret, and creates the secret in the specified namespace.
+    Parses command-line arguments, generates a new secret, and creates or (with --force)
+    replaces the Kubernetes secret in the specified namespace. With --target, --targets-file
+    or --selector, provisions many secrets instead.
     """
     parser = argparse.ArgumentParser(
         description="Check for the Kubernetes secret 'execution-jwt' and generate one if it doesn't exist. "
@@ -147,22 +311,57 @@ def main():
         default="default",
         help="Kubernetes namespace to check/create the secret (default: default)."
     )
-    
+    many = parser.add_argument_group("multiple targets")
+    many.add_argument(
+        "--target",
+        action="append",
+        metavar="NAMESPACE/NAME",
+        help="Provision this secret; may be repeated."
+    )
+    many.add_argument(
+        "--targets-file",
+        help="File with one NAMESPACE/NAME target per line."
+    )
+    many.add_argument(
+        "--selector",
+        help="Provision the auth-jwt secret of every StatefulSet matching this label selector "
+             "(in --namespace, or everywhere with --all-namespaces)."
+    )
+    many.add_argument(
+        "--all-namespaces",
+        action="store_true",
+        help="With --selector, search all namespaces."
+    )
+    many.add_argument(
+        "--workers",
+        type=int,
+        default=16,
+        help="Targets provisioned concurrently (default: 16)."
+    )
+
     args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be >= 1")
+    if args.target or args.targets_file or args.selector:
+        provision_many(args, parser)
+        return
 
-    exists = check_secret_exists(args.name, args.namespace)
-    if exists and not args.force:
+    api = load_kube_api()
+    new_secret = generate_secret()
+    try:
+        outcome = ensure_secret(api, args.name, args.namespace, new_secret, args.force)
+    except ApiException as e:
+        print(f"Error writing secret '{args.name}' in namespace '{args.namespace}': {e.status} {e.reason}")
+        sys.exit(1)
+    except (TransportError, OSError) as e:
+        print(f"Error writing secret '{args.name}' in namespace '{args.namespace}': {e}")
+        sys.exit(1)
+
+    if outcome == "exists":
         print(f"Secret '{args.name}' already exists in namespace '{args.namespace}'. Use --force to regenerate it.")
         sys.exit(0)
-    elif exists and args.force:
-        print(f"Secret '{args.name}' exists in namespace '{args.namespace}'. Deleting it due to --force option.")
-        delete_secret(args.name, args.namespace)
-    
-    # Generate a new secret and create it as a Kubernetes secret.
-    new_secret = generate_secret()
     print(f"Generated new secret: {new_secret}")
-    create_secret(args.name, args.namespace, new_secret)
-    print(f"Secret '{args.name}' has been created in namespace '{args.namespace}'.")
+    print(f"Secret '{args.name}' has been {outcome} in namespace '{args.namespace}'.")
 
 if __name__ == '__main__':
     main()
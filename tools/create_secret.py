@@ -14,15 +14,45 @@ Usage examples:
 
   # Explicit secret name and namespace; overwrite if it exists
   python create_secret.py -f cert.pem -s tls-cert -n myns --force
+
+Every write stamps a content-hash annotation; when the stored hash already
+matches, the write is skipped (one metadata-only read, no resourceVersion
+bump, exit 0), so re-running with the same input is a no-op.
+
+With --apply, every write is instead a single server-side apply PATCH owned
+by --field-manager (create or update, no read, no resourceVersion races);
+--force then takes over fields owned by other managers. --diff shows what an
+apply would change, from a dry-run apply compared with the live object, and
+writes nothing (exit 1 if anything would change).
+  python create_secret.py -f cert.pem -s tls-cert --apply
+  python create_secret.py -d ./validator_keys -s vc-keystores --diff
+
+  # Directory: every file becomes a key of one Secret (named after the directory)
+  python create_secret.py -d ./validator_keys -s vc-keystores
+
+  # Directory: one Secret per file, named <prefix>-<file stem>, payload under -k
+  python create_secret.py -d ./passwords --per-file -s vc-pw -k password
+
+  # Payloads over --chunk-size are split automatically into chunk Secrets
+  # (<name>-chunk-<payload hash>-0000, ...) plus a manifest Secret <name> with
+  # their hashes; a rewrite never touches the chunks the old manifest lists
+  python create_secret.py -f slashing_protection.sqlite -s vc-slashing-db
+
+  # Read a Secret back (chunked or not), verifying chunk hashes, to stdout or -o
+  python create_secret.py --read -s vc-slashing-db -o slashing_protection.sqlite
 """
 import argparse
 import base64
 import datetime as dt
+import hashlib
+import json
 import os
 import re
 import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from kubernetes import client, config
 from kubernetes.client.exceptions import ApiException
@@ -69,6 +99,19 @@ def default_name_from_file(file_path: str) -> str:
     return sanitize_name(stem_all)
 
 
+def sanitize_key(name: str) -> str:
+    """Make a valid Secret data key ([-._a-zA-Z0-9]+)."""
+    return re.sub(r"[^-._a-zA-Z0-9]", "_", name)[:253] or "_"
+
+
+def list_directory_files(directory: str) -> List[str]:
+    """Regular, non-hidden files directly inside `directory`, sorted."""
+    return sorted(
+        str(p) for p in Path(directory).iterdir()
+        if p.is_file() and not p.name.startswith(".")
+    )
+
+
 def guess_default_namespace() -> str:
     # 1) in-cluster SA namespace
     sa_ns_file = "/var/run/secrets/kubernetes.io/serviceaccount/namespace"
@@ -106,6 +149,49 @@ def load_kube_config() -> Tuple[bool, Optional[Exception]]:
             return False, e_out
 
 
+CONTENT_HASH_ANNOTATION = "create-secret/content-sha256"
+PARTIAL_METADATA = "application/json;as=PartialObjectMetadata;g=meta.k8s.io;v=v1"
+PARTIAL_METADATA_LIST = "application/json;as=PartialObjectMetadataList;g=meta.k8s.io;v=v1"
+APPLY_PATCH = "application/apply-patch+yaml"
+DEFAULT_FIELD_MANAGER = "create-secret"
+
+
+def content_hash(data: Dict[str, bytes], secret_type: str) -> str:
+    """SHA-256 over the type and the key-sorted data (each key and value length-prefixed)."""
+    h = hashlib.sha256(secret_type.encode("utf-8") + b"\0")
+    for key in sorted(data):
+        value = data[key]
+        h.update(key.encode("utf-8") + b"\0" + len(value).to_bytes(8, "big") + value)
+    return h.hexdigest()
+
+
+def read_secret_metadata(api: client.CoreV1Api, name: str, namespace: str) -> Optional[dict]:
+    """
+    Fetch only the Secret's metadata (PartialObjectMetadata), or None if it
+    does not exist. The data itself is never transferred.
+    """
+    try:
+        resp = api.read_namespaced_secret(
+            name=name, namespace=namespace, _preload_content=False, _headers={"Accept": PARTIAL_METADATA}
+        )
+    except ApiException as e:
+        if e.status == 404:
+            return None
+        raise
+    return json.loads(resp.data).get("metadata") or {}
+
+
+def make_core_api(workers: int = 1) -> client.CoreV1Api:
+    """Load the kube config (exit 3 on failure) and return a CoreV1Api sized for `workers` threads."""
+    loaded, err = load_kube_config()
+    if not loaded:
+        print(f"Failed to load Kubernetes config: {err!s}", file=sys.stderr)
+        sys.exit(3)
+    cfg = client.Configuration.get_default_copy()
+    cfg.connection_pool_maxsize = max(workers, cfg.connection_pool_maxsize or 1)
+    return client.CoreV1Api(client.ApiClient(cfg))
+
+
 def ensure_secret(
     api: client.CoreV1Api,
     name: str,
@@ -114,51 +200,458 @@ def ensure_secret(
     raw_bytes: bytes,
     secret_type: str,
     force: bool,
-) -> None:
-    b64 = base64.b64encode(raw_bytes).decode("ascii")
-    metadata = client.V1ObjectMeta(name=name, namespace=namespace)
+    field_manager: Optional[str] = None,
+    diff: bool = False,
+) -> str:
+    outcome = write_secret(
+        api, name, namespace, {data_key: raw_bytes}, secret_type, force, field_manager, diff
+    )
+    if outcome in ("exists", "changed"):
+        sys.exit(1)
+    return outcome
+
+
+def apply_secret(
+    api: client.CoreV1Api,
+    name: str,
+    namespace: str,
+    data: Dict[str, bytes],
+    secret_type: str,
+    field_manager: str,
+    force: bool,
+    dry_run: bool = False,
+    labels: Optional[Dict[str, str]] = None,
+) -> Tuple[client.V1Secret, int]:
+    """Server-side apply the Secret in one PATCH; return the resulting object and HTTP status."""
+    body = {
+        "apiVersion": "v1",
+        "kind": "Secret",
+        "metadata": {
+            "name": name,
+            "namespace": namespace,
+            "annotations": {CONTENT_HASH_ANNOTATION: content_hash(data, secret_type)},
+        },
+        "type": secret_type,
+        "data": {k: base64.b64encode(v).decode("ascii") for k, v in data.items()},
+    }
+    if labels:
+        body["metadata"]["labels"] = labels
+    obj, status, _headers = api.patch_namespaced_secret_with_http_info(
+        name=name,
+        namespace=namespace,
+        body=body,
+        field_manager=field_manager,
+        force=force,
+        dry_run="All" if dry_run else None,
+        _content_type=APPLY_PATCH,
+    )
+    return obj, status
+
+
+def _describe_value(b64: str) -> str:
+    raw = base64.b64decode(b64)
+    return f"{len(raw)} bytes, sha256 {hashlib.sha256(raw).hexdigest()[:12]}"
+
+
+def print_secret_diff(name: str, live: Optional[client.V1Secret], applied: client.V1Secret) -> bool:
+    """
+    Print how the dry-run `applied` object differs from `live` (None if the
+    Secret does not exist yet), showing sizes and hash prefixes rather than
+    values. Returns whether anything differs.
+    """
+    before = (live.data or {}) if live else {}
+    after = applied.data or {}
+    lines = []
+    if live is None:
+        lines.append(f"+ Secret (new, type {applied.type})")
+    elif live.type != applied.type:
+        lines.append(f"~ type: {live.type} -> {applied.type}")
+    for key in sorted(set(before) | set(after)):
+        if key not in before:
+            lines.append(f"+ data.{key} ({_describe_value(after[key])})")
+        elif key not in after:
+            lines.append(f"- data.{key} ({_describe_value(before[key])})")
+        elif before[key] != after[key]:
+            lines.append(f"~ data.{key} ({_describe_value(before[key])} -> {_describe_value(after[key])})")
+    live_ann = (live.metadata.annotations or {}) if live else {}
+    for key, value in sorted((applied.metadata.annotations or {}).items()):
+        if live is not None and live_ann.get(key) != value:
+            lines.append(f"~ metadata.annotations.{key}: {live_ann.get(key)} -> {value}")
+    print(f"--- Secret '{name}': " + ("no changes" if not lines else f"{len(lines)} change(s)"))
+    for line in lines:
+        print(f"  {line}")
+    return bool(lines)
+
+
+def write_secret(
+    api: client.CoreV1Api,
+    name: str,
+    namespace: str,
+    data: Dict[str, bytes],
+    secret_type: str,
+    force: bool,
+    field_manager: Optional[str] = None,
+    diff: bool = False,
+    labels: Optional[Dict[str, str]] = None,
+) -> str:
+    """
+    Create or (with force) replace the Secret; return 'created', 'replaced',
+    'unchanged' (stored content hash already matches, nothing written) or 'exists'.
+
+    With field_manager, server-side apply it instead in a single PATCH and
+    return 'created' or 'applied' (force takes over conflicting fields); with
+    diff as well, only dry-run the apply, print the changes and return
+    'changed' or 'unchanged'.
+    """
+    if field_manager and diff:
+        try:
+            live = api.read_namespaced_secret(name=name, namespace=namespace)
+        except ApiException as e:
+            if e.status != 404:
+                raise
+            live = None
+        applied, _status = apply_secret(
+            api, name, namespace, data, secret_type, field_manager, force, dry_run=True, labels=labels
+        )
+        return "changed" if print_secret_diff(name, live, applied) else "unchanged"
+    if field_manager:
+        _obj, status = apply_secret(
+            api, name, namespace, data, secret_type, field_manager, force, labels=labels
+        )
+        outcome = "created" if status == 201 else "applied"
+        print(f"Applied Secret '{name}' in namespace '{namespace}' ({outcome}, field manager '{field_manager}').")
+        return outcome
+
+    digest = content_hash(data, secret_type)
+    metadata = client.V1ObjectMeta(
+        name=name, namespace=namespace, annotations={CONTENT_HASH_ANNOTATION: digest}, labels=labels
+    )
     body = client.V1Secret(
         api_version="v1",
         kind="Secret",
         metadata=metadata,
         type=secret_type,
-        data={data_key: b64},
+        data={k: base64.b64encode(v).decode("ascii") for k, v in data.items()},
     )
 
-    # Check existence
-    try:
-        existing = api.read_namespaced_secret(name=name, namespace=namespace)
-        exists = True
-    except ApiException as e:
-        if e.status == 404:
-            exists = False
-        else:
-            raise
+    # Check existence (metadata only)
+    existing = read_secret_metadata(api, name, namespace)
+    exists = existing is not None
+
+    if exists and (existing.get("annotations") or {}).get(CONTENT_HASH_ANNOTATION) == digest:
+        print(f"Secret '{name}' in namespace '{namespace}' is unchanged; skipped write.")
+        return "unchanged"
 
     if exists and not force:
         print(
             f"Secret '{name}' already exists in namespace '{namespace}'. Use --force to overwrite.",
             file=sys.stderr,
         )
-        sys.exit(1)
+        return "exists"
 
     if exists and force:
-        body.metadata.resource_version = existing.metadata.resource_version
+        body.metadata.resource_version = existing.get("resourceVersion")
         api.replace_namespaced_secret(name=name, namespace=namespace, body=body)
         print(f"Replaced Secret '{name}' in namespace '{namespace}'.")
-    else:
-        api.create_namespaced_secret(namespace=namespace, body=body)
-        print(f"Created Secret '{name}' in namespace '{namespace}'.")
+        return "replaced"
+    api.create_namespaced_secret(namespace=namespace, body=body)
+    print(f"Created Secret '{name}' in namespace '{namespace}'.")
+    return "created"
+
+
+# Secret data is capped at 1 MiB and travels base64-encoded (4/3 larger), so
+# chunks stay at 3/4 of that.
+DEFAULT_CHUNK_BYTES = 768 * 1024
+MANIFEST_KEY = "manifest.json"
+MANIFEST_VERSION = 1
+MANIFEST_LABEL = "create-secret/manifest"  # on chunk Secrets: which manifest they belong to
+
+
+class IntegrityError(Exception):
+    pass
+
+
+def chunk_name(name: str, index: int, digest: str) -> str:
+    """Chunk Secret name, addressed by the payload's SHA-256 so a rewrite never reuses it."""
+    suffix = f"-chunk-{digest[:16]}-{index:04d}"
+    return name[:253 - len(suffix)].rstrip("-") + suffix
+
+
+def delete_chunks(api: client.CoreV1Api, namespace: str, names: List[str]) -> int:
+    """Delete chunk Secrets, ignoring ones already gone; return how many were deleted."""
+    deleted = 0
+    for n in names:
+        try:
+            api.delete_namespaced_secret(name=n, namespace=namespace)
+            deleted += 1
+        except ApiException as e:
+            if e.status != 404:
+                raise
+    return deleted
+
+
+def manifest_label(name: str) -> str:
+    """Value of MANIFEST_LABEL on the chunks of manifest `name` (label values are capped at 63)."""
+    if len(name) <= 63:
+        return name
+    return name[:46].rstrip("-.") + "-" + hashlib.sha256(name.encode("utf-8")).hexdigest()[:16]
+
+
+def prune_chunks(api: client.CoreV1Api, namespace: str, name: str, keep: List[str]) -> int:
+    """
+    Delete chunk Secrets labelled for manifest `name` that are not in `keep`,
+    found with one metadata-only list; return how many were deleted.
+    """
+    resp = api.list_namespaced_secret(
+        namespace,
+        label_selector=f"{MANIFEST_LABEL}={manifest_label(name)}",
+        _preload_content=False,
+        _headers={"Accept": PARTIAL_METADATA_LIST},
+    )
+    found = [item["metadata"]["name"] for item in json.loads(resp.data).get("items") or []]
+    return delete_chunks(api, namespace, [n for n in found if n not in keep])
+
+
+def write_chunked_secret(
+    api: client.CoreV1Api,
+    name: str,
+    namespace: str,
+    data_key: str,
+    raw_bytes: bytes,
+    force: bool,
+    chunk_size: int,
+    pool: ThreadPoolExecutor,
+    field_manager: Optional[str] = None,
+    diff: bool = False,
+) -> str:
+    """
+    Store `raw_bytes` as numbered chunk Secrets written concurrently, then the
+    manifest Secret `name` listing each chunk's name, length and SHA-256 plus
+    the total length and hash. Chunk names carry the payload hash, so a
+    forced rewrite creates new chunks instead of overwriting the ones a
+    reader of the old manifest is fetching. Chunks carry MANIFEST_LABEL. The
+    manifest goes last so readers never see one that points at missing
+    chunks; chunks of earlier payloads are then found by label and deleted. Without force or field_manager an existing
+    manifest is detected (metadata only) before any chunk is written, and
+    chunks this call created are deleted again if a chunk or the manifest
+    cannot be written. Returns the manifest's outcome, or 'exists'/'failed'
+    if a chunk could not be written. With diff nothing is written or deleted;
+    each chunk and the manifest are only diffed.
+    """
+    pieces = [raw_bytes[i:i + chunk_size] for i in range(0, len(raw_bytes), chunk_size)]
+    digest = hashlib.sha256(raw_bytes).hexdigest()
+    names = [chunk_name(name, i, digest) for i in range(len(pieces))]
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "key": data_key,
+        "total_length": len(raw_bytes),
+        "sha256": digest,
+        "chunks": [
+            {"name": n, "length": len(piece), "sha256": hashlib.sha256(piece).hexdigest()}
+            for n, piece in zip(names, pieces)
+        ],
+    }
+    manifest_data = {MANIFEST_KEY: json.dumps(manifest, indent=1).encode("utf-8")}
+
+    if not (force or field_manager):
+        # The manifest write would be refused; find out before any chunk is written.
+        existing = read_secret_metadata(api, name, namespace)
+        if existing is not None:
+            stored = (existing.get("annotations") or {}).get(CONTENT_HASH_ANNOTATION)
+            if stored == content_hash(manifest_data, "Opaque"):
+                print(f"Secret '{name}' in namespace '{namespace}' is unchanged; skipped write.")
+                return "unchanged"
+            print(
+                f"Secret '{name}' already exists in namespace '{namespace}'. Use --force to overwrite.",
+                file=sys.stderr,
+            )
+            return "exists"
+
+    def one(i: int) -> str:
+        try:
+            return write_secret(
+                api, names[i], namespace, {data_key: pieces[i]}, "Opaque", force, field_manager, diff,
+                labels={MANIFEST_LABEL: manifest_label(name)},
+            )
+        except ApiException as e:
+            print(f"Kubernetes API error for Secret '{names[i]}' (status {e.status}): {e.reason}", file=sys.stderr)
+            return "failed"
+
+    results = list(pool.map(one, range(len(pieces))))
+    outcomes = Counter(results)
+    created = [n for n, outcome in zip(names, results) if outcome == "created"]
+
+    def rollback() -> None:
+        """Delete the chunks this call created; no manifest points at them."""
+        try:
+            removed = delete_chunks(api, namespace, created)
+        except ApiException as e:
+            print(f"Could not remove chunk(s) written by this run (status {e.status}): {e.reason}",
+                  file=sys.stderr)
+            return
+        if removed:
+            print(f"Removed {removed} chunk(s) written by this run.", file=sys.stderr)
+
+    if outcomes["failed"] or outcomes["exists"]:
+        rollback()
+        return "failed" if outcomes["failed"] else "exists"
+
+    try:
+        outcome = write_secret(api, name, namespace, manifest_data, "Opaque", force, field_manager, diff)
+    except ApiException:
+        rollback()
+        raise
+    if diff:
+        return "changed" if outcome == "changed" or outcomes["changed"] else "unchanged"
+    if outcome not in ("created", "replaced", "applied", "unchanged"):
+        rollback()
+        return outcome
+
+    removed = prune_chunks(api, namespace, name, names) if outcome != "unchanged" else 0
+    print(f"Stored {len(raw_bytes)} bytes as {len(pieces)} chunk(s) under manifest Secret '{name}'"
+          + (f"; removed {removed} stale chunk(s)." if removed else "."))
+    return outcome
+
+
+def _decode_key(secret: client.V1Secret, key: str) -> bytes:
+    raw = (secret.data or {}).get(key)
+    if raw is None:
+        raise IntegrityError(f"Secret '{secret.metadata.name}' has no key '{key}'")
+    return base64.b64decode(raw)
+
+
+def stream_secret(
+    api: client.CoreV1Api, name: str, namespace: str, data_key: str, out, pool: ThreadPoolExecutor
+) -> int:
+    """
+    Write the payload of Secret `name` to `out` and return its length. For a
+    chunk manifest, the chunks are fetched concurrently and written in order,
+    each verified against its manifest hash before it is written; the total
+    length and hash are checked at the end. Raises IntegrityError on mismatch.
+    """
+    secret = api.read_namespaced_secret(name=name, namespace=namespace)
+    if MANIFEST_KEY not in (secret.data or {}):
+        payload = _decode_key(secret, data_key)
+        out.write(payload)
+        return len(payload)
+
+    manifest = json.loads(_decode_key(secret, MANIFEST_KEY))
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise IntegrityError(f"unsupported manifest version {manifest.get('version')!r}")
+    key = manifest["key"]
+    fetch = lambda c: _decode_key(api.read_namespaced_secret(name=c["name"], namespace=namespace), key)  # noqa: E731
+    total = hashlib.sha256()
+    length = 0
+    for chunk, piece in zip(manifest["chunks"], pool.map(fetch, manifest["chunks"])):
+        if len(piece) != chunk["length"] or hashlib.sha256(piece).hexdigest() != chunk["sha256"]:
+            raise IntegrityError(f"chunk '{chunk['name']}' does not match the manifest")
+        out.write(piece)
+        total.update(piece)
+        length += len(piece)
+    if length != manifest["total_length"] or total.hexdigest() != manifest["sha256"]:
+        raise IntegrityError("reassembled payload does not match the manifest")
+    return length
+
+
+def read_main(args: argparse.Namespace, namespace: str) -> None:
+    if not args.secretname:
+        print("--read needs the Secret name (-s).", file=sys.stderr)
+        sys.exit(2)
+    name = sanitize_name(args.secretname)
+    api = make_core_api(args.workers)
+    tmp = f"{args.output}.tmp" if args.output else None
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            if tmp:
+                with open(tmp, "wb") as out:
+                    length = stream_secret(api, name, namespace, args.key, out, pool)
+                os.replace(tmp, args.output)
+            else:
+                length = stream_secret(api, name, namespace, args.key, sys.stdout.buffer, pool)
+                sys.stdout.buffer.flush()
+    except ApiException as e:
+        print(f"Kubernetes API error (status {e.status}): {e.reason}", file=sys.stderr)
+        sys.exit(4)
+    except (IntegrityError, ValueError, KeyError) as e:
+        print(f"Cannot reassemble Secret '{name}': {e}", file=sys.stderr)
+        sys.exit(5)
+    finally:
+        if tmp and os.path.exists(tmp):
+            os.unlink(tmp)
+    if args.output:
+        print(f"Wrote {length} bytes from Secret '{name}' to '{args.output}'.", file=sys.stderr)
+
+
+def read_directory(directory: str, pool: ThreadPoolExecutor) -> Dict[str, bytes]:
+    """Read every file in `directory` concurrently; path -> bytes, skipping empty files."""
+    paths = list_directory_files(directory)
+    contents: Dict[str, bytes] = {}
+    for path, raw in zip(paths, pool.map(read_bytes_from_source, paths)):
+        if raw:
+            contents[path] = raw
+        else:
+            print(f"Skipping empty file '{path}'.", file=sys.stderr)
+    return contents
+
+
+def plan_directory_secrets(
+    contents: Dict[str, bytes], directory: str, prefix: Optional[str], data_key: str, per_file: bool
+) -> Dict[str, Dict[str, bytes]]:
+    """
+    Map file contents to Secret name -> data. One Secret keyed by file name,
+    or with per_file one Secret per file holding its bytes under data_key.
+    Raises ValueError when two files map to the same name or key.
+    """
+    plan: Dict[str, Dict[str, bytes]] = {}
+    for path, raw in contents.items():
+        if per_file:
+            stem = strip_all_suffixes(Path(path)).name or Path(path).name
+            name, key = sanitize_name(f"{prefix}-{stem}" if prefix else stem), data_key
+        else:
+            name = sanitize_name(prefix or Path(directory).resolve().name)
+            key = sanitize_key(Path(path).name)
+        if key in plan.get(name, {}):
+            raise ValueError(f"'{path}' collides with another file as Secret '{name}' key '{key}'")
+        plan.setdefault(name, {})[key] = raw
+    return plan
+
+
+def write_directory_secrets(
+    api: client.CoreV1Api,
+    namespace: str,
+    plan: Dict[str, Dict[str, bytes]],
+    secret_type: str,
+    force: bool,
+    pool: ThreadPoolExecutor,
+    field_manager: Optional[str] = None,
+    diff: bool = False,
+) -> Counter:
+    """Write every planned Secret concurrently over one client; count outcomes ('failed' on API errors)."""
+
+    def one(name: str) -> str:
+        try:
+            return write_secret(api, name, namespace, plan[name], secret_type, force, field_manager, diff)
+        except ApiException as e:
+            print(f"Kubernetes API error for Secret '{name}' (status {e.status}): {e.reason}", file=sys.stderr)
+            return "failed"
+
+    return Counter(pool.map(one, plan))
 
 
 def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(
         description="Create a Kubernetes Secret from a file or stdin."
     )
-    p.add_argument(
+    src = p.add_mutually_exclusive_group()
+    src.add_argument(
         "-f", "--file",
         help="Path to file containing the secret bytes. If omitted, read from stdin.",
     )
+    src.add_argument(
+        "-d", "--dir",
+        help="Directory mode: store every file in DIR as a key of one Secret "
+             "(named by -s or after the directory), or see --per-file.",
+    )
     p.add_argument(
         "-s", "--secretname",
         help="Secret name. Defaults to sanitized file name; if reading from stdin, "
@@ -181,14 +674,105 @@ def parse_args() -> argparse.Namespace:
     p.add_argument(
         "--force",
         action="store_true",
-        help="Overwrite the Secret if it already exists.",
+        help="Overwrite the Secret if it already exists (with --apply: take over fields owned by other managers).",
     )
-    return p.parse_args()
+    p.add_argument(
+        "--apply",
+        action="store_true",
+        help="Create or update with a single server-side apply PATCH instead of read-then-create/replace.",
+    )
+    p.add_argument(
+        "--field-manager",
+        default=DEFAULT_FIELD_MANAGER,
+        help="Field manager name for --apply (default: %(default)s).",
+    )
+    p.add_argument(
+        "--diff",
+        action="store_true",
+        help="Show what --apply would change (server-side dry run) and write nothing; exit 1 on changes.",
+    )
+    p.add_argument(
+        "--per-file",
+        action="store_true",
+        help="With --dir: one Secret per file, named '<-s>-<file stem>' (or the stem), "
+             "holding the file under --key.",
+    )
+    p.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=8,
+        help="With --dir, chunking or --read: concurrent file reads and API calls (default: 8).",
+    )
+    p.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_BYTES,
+        help="Payloads larger than this are split into chunk Secrets plus a manifest "
+             "(default: %(default)s bytes).",
+    )
+    p.add_argument(
+        "--read",
+        action="store_true",
+        help="Read Secret -s back instead of writing it; chunked Secrets are reassembled and verified.",
+    )
+    p.add_argument(
+        "-o", "--output",
+        help="With --read: write the payload here instead of stdout.",
+    )
+    args = p.parse_args()
+    if args.per_file and not args.dir:
+        p.error("--per-file requires --dir")
+    if args.read and (args.file or args.dir):
+        p.error("--read cannot be combined with -f or -d")
+    if args.output and not args.read:
+        p.error("--output requires --read")
+    if args.read and (args.apply or args.diff):
+        p.error("--read cannot be combined with --apply or --diff")
+    args.field_manager = args.field_manager if (args.apply or args.diff) else None
+    if args.workers < 1 or args.chunk_size < 1:
+        p.error("--workers and --chunk-size must be >= 1")
+    return args
+
+
+def directory_main(args: argparse.Namespace, namespace: str) -> None:
+    if not os.path.isdir(args.dir):
+        print(f"Not a directory: {args.dir}", file=sys.stderr)
+        sys.exit(2)
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        contents = read_directory(args.dir, pool)
+        try:
+            plan = plan_directory_secrets(contents, args.dir, args.secretname, args.key, args.per_file)
+        except ValueError as e:
+            print(str(e), file=sys.stderr)
+            sys.exit(2)
+        if not plan:
+            print(f"Refusing to create an empty Secret (no non-empty files in '{args.dir}').", file=sys.stderr)
+            sys.exit(2)
+
+        api = make_core_api(args.workers)
+        counts = write_directory_secrets(
+            api, namespace, plan, args.type, bool(args.force), pool, args.field_manager, args.diff
+        )
+    print(
+        f"{len(contents)} file(s) into {len(plan)} Secret(s): "
+        + ", ".join(f"{counts[k]} {k}" for k in sorted(counts))
+    )
+    if counts["failed"]:
+        sys.exit(4)
+    if counts["exists"] or counts["changed"]:
+        sys.exit(1)
 
 
 def main() -> None:
     args = parse_args()
 
+    if args.read:
+        read_main(args, args.namespace or guess_default_namespace())
+        return
+    if args.dir:
+        directory_main(args, args.namespace or guess_default_namespace())
+        return
+
     # Determine secret name
     if args.secretname:
         name = sanitize_name(args.secretname)
@@ -206,16 +790,29 @@ def main() -> None:
         print("Refusing to create an empty Secret (no input provided).", file=sys.stderr)
         sys.exit(2)
 
+    chunked = len(payload) > args.chunk_size
+    if chunked and args.type != "Opaque":
+        print(f"Payload of {len(payload)} bytes exceeds --chunk-size; only Opaque Secrets can be chunked.",
+              file=sys.stderr)
+        sys.exit(2)
+
     # Kube client
-    loaded, err = load_kube_config()
-    if not loaded:
-        print(f"Failed to load Kubernetes config: {err!s}", file=sys.stderr)
-        sys.exit(3)
-    api = client.CoreV1Api()
+    api = make_core_api(args.workers if chunked else 1)
 
     # Create or replace
     try:
-        ensure_secret(
+        if chunked:
+            with ThreadPoolExecutor(max_workers=args.workers) as pool:
+                outcome = write_chunked_secret(
+                    api, name, namespace, args.key, payload, bool(args.force), args.chunk_size, pool,
+                    args.field_manager, args.diff,
+                )
+            if outcome == "failed":
+                sys.exit(4)
+            if outcome in ("exists", "changed"):
+                sys.exit(1)
+            return
+        outcome = ensure_secret(
             api=api,
             name=name,
             namespace=namespace,
@@ -223,7 +820,14 @@ def main() -> None:
             raw_bytes=payload,
             secret_type=args.type,
             force=bool(args.force),
+            field_manager=args.field_manager,
+            diff=args.diff,
         )
+        # A payload that now fits may have replaced a manifest; its chunks are found by label.
+        if outcome in ("replaced", "applied"):
+            removed = prune_chunks(api, namespace, name, [])
+            if removed:
+                print(f"Removed {removed} chunk(s) of the previous manifest.")
     except ApiException as e:
         msg = getattr(e, "reason", str(e))
         status = getattr(e, "status", "unknown")
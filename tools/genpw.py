@@ -15,15 +15,38 @@ python pwgen.py -l 16 -n staging -s db-pw
 
 # Replace the Secret if it already exists
 python pwgen.py -l 20 -s db-pw --force
+
+# Batch: one Secret per name, or N Secrets from a {i} template
+python pwgen.py -l 32 --batch vc-0-pw vc-1-pw vc-2-pw
+python pwgen.py -l 32 --template keystore-pw-{i} --count 500 -w 32
+
+# Lighthouse secrets-dir: one 0x<pubkey> password file per keystore, written
+# to a directory and/or stored as a Secret (sharded as NAME-0, NAME-1, ...
+# when it would exceed the Secret size limit). The keystores are already
+# encrypted, so the password is read from a file and checked against every
+# keystore's checksum before anything is written.
+python pwgen.py --keystores ./validator_keys --password-file pw.txt --out-dir /usb/pw --secrets-secret vc-pw
 """
 
 import argparse
+import glob
+import json
+import os
+import re
 import secrets
 import string
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from random import SystemRandom
+from typing import Dict, List, Tuple
 
 from kubernetes import client, config
 from kubernetes.client.rest import ApiException
+from kubernetes.config import kube_config
+from urllib3.exceptions import HTTPError as TransportError
+
+from add_validator import verify_keystore_password
 
 
 # ───────────────────────── Password generation ──────────────────────────
@@ -42,39 +65,323 @@ def generate_password(length: int = 10) -> str:
     return "".join(chars)
 
 
+# Bulk generation maps raw CSPRNG bytes onto the alphabet with bytes.translate,
+# deleting the top 256 % 62 byte values so every character stays uniform.
+ALPHABET = string.ascii_letters + string.digits
+_ACCEPT_BELOW = 256 - 256 % len(ALPHABET)
+_TO_ALPHABET = bytes(ord(ALPHABET[b % len(ALPHABET)]) for b in range(256))
+_REJECT = bytes(range(_ACCEPT_BELOW, 256))
+_CLASSES = tuple(c.encode("ascii") for c in (string.ascii_lowercase, string.ascii_uppercase, string.digits))
+
+
+def _valid_fraction(length: int) -> float:
+    """Probability that `length` uniform characters include a lower, an upper and a digit."""
+    n = len(ALPHABET)
+    lower, upper, digits = (len(c) for c in _CLASSES)
+    missing_one = ((n - lower) / n) ** length + ((n - upper) / n) ** length + ((n - digits) / n) ** length
+    only_one = (lower / n) ** length + (upper / n) ** length + (digits / n) ** length
+    return 1.0 - missing_one + only_one
+
+
+def generate_passwords(count: int, length: int = 10) -> List[str]:
+    """
+    `count` passwords with the same lower/upper/digit guarantee as
+    generate_password(), from one os.urandom() read sized for the expected
+    rejections (topped up in the rare case it falls short).
+
+    Bytes are mapped to characters and out-of-range bytes dropped in a single
+    bytes.translate() pass; candidate passwords missing a class are then
+    rejected whole, so the result is uniform over all valid passwords.
+    """
+    if length < 3:
+        raise ValueError("Length must be at least 3 (lower, upper, digit).")
+
+    per_password = length / _valid_fraction(length) * 256 / _ACCEPT_BELOW
+    passwords: List[str] = []
+    stream = b""
+    while len(passwords) < count:
+        nbytes = int((count - len(passwords)) * per_password * 1.05) + 64
+        stream += os.urandom(nbytes).translate(_TO_ALPHABET, _REJECT)
+        usable = len(stream) - len(stream) % length
+        for off in range(0, usable, length):
+            candidate = stream[off:off + length]
+            if all(len(candidate.translate(None, cls)) < length for cls in _CLASSES):
+                passwords.append(candidate.decode("ascii"))
+                if len(passwords) == count:
+                    break
+        stream = stream[usable:]
+    return passwords
+
+
 # ───────────────────────── Kubernetes helpers ───────────────────────────
-def get_default_namespace() -> str:
-    """Return namespace from current kube-context, defaulting to 'default'."""
-    contexts, current = config.list_kube_config_contexts()
-    if not current:
-        return "default"
-    return current.get("context", {}).get("namespace", "default")
+def load_kube_client(workers: int = 1) -> Tuple[client.CoreV1Api, str]:
+    """
+    Parse the kubeconfig once and return a CoreV1Api for the current context
+    together with that context's namespace (or 'default').
+    """
+    merged = kube_config.KubeConfigMerger(kube_config.KUBE_CONFIG_DEFAULT_LOCATION)
+    if merged.config is None:
+        raise config.ConfigException("Invalid kube-config file. No configuration found.")
+    loader = kube_config.KubeConfigLoader(config_dict=merged.config, config_persister=merged.save_changes)
+    cfg = client.Configuration()
+    loader.load_and_set(cfg)
+    cfg.connection_pool_maxsize = max(workers, cfg.connection_pool_maxsize or 1)
+    namespace = (loader.current_context.get("context") or {}).get("namespace") or "default"
+    return client.CoreV1Api(client.ApiClient(cfg)), namespace
 
 
-def create_secret(namespace: str, name: str, password: str, force: bool) -> None:
-    v1 = client.CoreV1Api()
+def create_secret(
+    namespace: str, name: str, string_data: Dict[str, str], force: bool, v1: client.CoreV1Api = None
+) -> str:
+    """Create (or with force, replace) the Secret; return 'created', 'replaced' or 'skipped'."""
+    v1 = v1 or client.CoreV1Api()
     body = client.V1Secret(
         metadata=client.V1ObjectMeta(name=name),
         type="Opaque",
-        string_data={"password": password},
+        string_data=string_data,
     )
 
     try:
         v1.create_namespaced_secret(namespace, body)
         print(f"✅ Secret '{name}' created in namespace '{namespace}'.")
+        return "created"
     except ApiException as e:
         if e.status == 409:  # Already exists
             if force:
                 v1.replace_namespaced_secret(name, namespace, body)
                 print(f"♻️  Secret '{name}' replaced in namespace '{namespace}'.")
-            else:
-                print(
-                    f"⚠️  Secret '{name}' already exists in namespace '{namespace}'. "
-                    "Use --force to replace it."
-                )
+                return "replaced"
+            print(
+                f"⚠️  Secret '{name}' already exists in namespace '{namespace}'. "
+                "Use --force to replace it."
+            )
+            return "skipped"
+        raise
+
+
+def _create_or_fail(v1: client.CoreV1Api, namespace: str, name: str, string_data: Dict[str, str], force: bool) -> str:
+    try:
+        return create_secret(namespace, name, string_data, force, v1)
+    except ApiException as e:
+        print(f"❌ Secret '{name}': {e.status} {e.reason}", file=sys.stderr)
+        return "failed"
+    except (TransportError, OSError) as e:  # no answer from the API server
+        print(f"❌ Secret '{name}': {e}", file=sys.stderr)
+        return "failed"
+
+
+def create_secrets(
+    v1: client.CoreV1Api, namespace: str, secrets_data: Dict[str, Dict[str, str]], force: bool, workers: int
+) -> Counter:
+    """Create one Secret per name -> string_data entry concurrently over a shared client."""
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return Counter(pool.map(
+            lambda name: _create_or_fail(v1, namespace, name, secrets_data[name], force), secrets_data
+        ))
+
+
+def print_counts(counts: Counter) -> None:
+    print(", ".join(f"{counts[k]} {k}" for k in ("created", "replaced", "skipped", "failed")))
+
+
+# ───────────────────────── Lighthouse secrets-dir ────────────────────────
+# Secret data is capped at 1 MiB; string_data travels base64-encoded (4/3
+# larger) in the request, so keep each shard's raw bytes to 3/4 of that.
+DEFAULT_SHARD_BYTES = 768 * 1024
+PUBKEY_RE = re.compile(r"^(0x)?[0-9a-fA-F]{96}$")
+
+
+def discover_keystores(paths: List[str]) -> List[str]:
+    """Expand files, directories (keystore*.json) and glob patterns, de-duplicated, in order."""
+    found: List[str] = []
+    for entry in paths:
+        if os.path.isdir(entry):
+            matches = sorted(glob.glob(os.path.join(entry, "keystore*.json")))
+        elif glob.has_magic(entry):
+            matches = sorted(glob.glob(entry))
         else:
+            matches = [entry]
+        found += [m for m in matches if m not in found]
+    return found
+
+
+def check_keystore(job: Tuple[str, str]) -> Tuple[str, str]:
+    """
+    Read one keystore and check `password` against its checksum. Return
+    (pubkey as Lighthouse names its secrets-dir file: 0x + lowercase hex, error).
+    """
+    path, password = job
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            keystore = json.load(f)
+    except (OSError, ValueError) as e:
+        return "", f"unable to read keystore: {e}"
+    pubkey = keystore.get("pubkey", "") if isinstance(keystore, dict) else ""
+    if not isinstance(pubkey, str) or not PUBKEY_RE.match(pubkey):
+        return "", "missing or malformed pubkey"
+    return "0x" + pubkey.lower()[-96:], verify_keystore_password(keystore, password)
+
+
+def shard_entries(entries: Dict[str, str], name: str, shard_bytes: int) -> Dict[str, Dict[str, str]]:
+    """
+    Pack file name -> password entries, in order, into as few Secrets as fit
+    under `shard_bytes` each. One shard keeps `name`; more become name-0, name-1, ...
+    """
+    shards: List[Dict[str, str]] = [{}]
+    size = 0
+    for key, value in entries.items():
+        entry_size = len(key) + len(value.encode("utf-8"))
+        if shards[-1] and size + entry_size > shard_bytes:
+            shards.append({})
+            size = 0
+        shards[-1][key] = value
+        size += entry_size
+    if len(shards) == 1:
+        return {name: shards[0]}
+    return {f"{name}-{i}": shard for i, shard in enumerate(shards)}
+
+
+def prune_stale_shards(v1: client.CoreV1Api, namespace: str, name: str, kept: Dict[str, Dict[str, str]]) -> List[str]:
+    """
+    Delete Secrets left by an earlier run with a different shard count: the
+    unsuffixed `name` once the data is sharded, and name-i past the new shards
+    (deleted in order until one is missing). Returns the deleted names.
+    """
+    def delete(secret_name: str) -> bool:
+        try:
+            v1.delete_namespaced_secret(secret_name, namespace)
+            return True
+        except ApiException as e:
+            if e.status == 404:
+                return False
             raise
 
+    deleted = []
+    if name not in kept and delete(name):
+        deleted.append(name)
+    i = 0 if name in kept else len(kept)
+    while delete(f"{name}-{i}"):
+        deleted.append(f"{name}-{i}")
+        i += 1
+    return deleted
+
+
+def write_password_file(directory: str, filename: str, password: str, force: bool) -> str:
+    """Write one 0600 password file atomically; return 'created', 'replaced' or 'skipped'."""
+    path = os.path.join(directory, filename)
+    exists = os.path.exists(path)
+    if exists and not force:
+        return "skipped"
+    tmp = f"{path}.tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(password)
+        os.replace(tmp, path)
+    except OSError:
+        os.unlink(tmp)
+        raise
+    return "replaced" if exists else "created"
+
+
+def _write_or_fail(directory: str, filename: str, password: str, force: bool) -> str:
+    try:
+        return write_password_file(directory, filename, password, force)
+    except OSError as e:
+        print(f"❌ Password file '{filename}': {e}", file=sys.stderr)
+        return "failed"
+
+
+def secrets_dir_mode(args: argparse.Namespace, parser: argparse.ArgumentParser) -> None:
+    paths = discover_keystores(args.keystores)
+    if not paths:
+        parser.error("--keystores matched no files")
+    try:
+        with open(args.password_file, "r", encoding="utf-8") as f:
+            password = f.read().rstrip("\r\n")
+    except OSError as e:
+        parser.error(f"cannot read --password-file: {e}")
+    if not password:
+        parser.error(f"{args.password_file} is empty")
+
+    # Each check runs the keystore's KDF, so spread them over processes.
+    jobs = [(path, password) for path in paths]
+    with ProcessPoolExecutor(max_workers=min(len(jobs), os.cpu_count() or 1)) as pool:
+        checked = list(pool.map(check_keystore, jobs))
+    bad = [(path, err) for path, (_, err) in zip(paths, checked) if err]
+    if bad:
+        print(f"❌ {len(bad)} of {len(paths)} keystore(s) do not decrypt with {args.password_file}; "
+              "nothing was written:", file=sys.stderr)
+        for path, err in bad:
+            print(f"  {path}: {err}", file=sys.stderr)
+        sys.exit(1)
+    pubkeys = [pk for pk, _ in checked]
+    unique = list(dict.fromkeys(pubkeys))
+    if len(unique) < len(pubkeys):
+        print(f"⚠️  {len(pubkeys) - len(unique)} duplicate keystore(s) ignored.", file=sys.stderr)
+
+    entries = {pk: password for pk in unique}
+    if args.show:
+        for pk, pw in entries.items():
+            print(f"{pk}\t{pw}")
+
+    v1 = None
+    if args.secrets_secret:
+        v1, context_namespace = load_kube_client(args.workers)
+        namespace = args.namespace or context_namespace
+        shards = shard_entries(entries, args.secrets_secret, args.shard_bytes)
+    if args.out_dir:
+        os.makedirs(args.out_dir, mode=0o700, exist_ok=True)
+
+    # Files and Secrets go through the same pool so neither waits on the other.
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        file_jobs = [
+            pool.submit(_write_or_fail, args.out_dir, pk, pw, args.force) for pk, pw in entries.items()
+        ] if args.out_dir else []
+        secret_jobs = [
+            pool.submit(_create_or_fail, v1, namespace, name, data, args.force) for name, data in shards.items()
+        ] if v1 else []
+        file_counts = Counter(job.result() for job in file_jobs)
+        secret_counts = Counter(job.result() for job in secret_jobs)
+
+    print(f"{len(entries)} validator key(s).")
+    if args.out_dir:
+        print(f"Password files in {args.out_dir}: ", end="")
+        print_counts(file_counts)
+        if file_counts["skipped"]:
+            print("⚠️  Existing password files were kept. Use --force to overwrite them.")
+    if v1:
+        print(f"Secrets ({len(shards)} shard(s)) in namespace '{namespace}': ", end="")
+        print_counts(secret_counts)
+        # Only once every shard holds the new data: a shard count that shrank
+        # (or grew past one) leaves Secrets the VC would still mount.
+        if args.force and set(secret_counts) <= {"created", "replaced"}:
+            try:
+                stale = prune_stale_shards(v1, namespace, args.secrets_secret, shards)
+            except (ApiException, TransportError, OSError) as e:
+                detail = f"{e.status} {e.reason}" if isinstance(e, ApiException) else e
+                print(f"❌ Cannot delete stale shards: {detail}", file=sys.stderr)
+                secret_counts["failed"] += 1
+            else:
+                if stale:
+                    print(f"🗑️  Deleted stale shard(s): {', '.join(stale)}")
+    if file_counts["failed"] or secret_counts["failed"]:
+        sys.exit(1)
+
+
+def batch_names(args: argparse.Namespace) -> List[str]:
+    if args.batch:
+        names = args.batch
+    else:
+        try:
+            names = [args.template.format(i=i) for i in range(args.start, args.start + args.count)]
+        except (KeyError, IndexError) as e:
+            raise ValueError(f"--template may only use the {{i}} placeholder, got {e}") from None
+    dupes = sorted(n for n, c in Counter(names).items() if c > 1)
+    if dupes:
+        raise ValueError(f"duplicate Secret names: {', '.join(dupes)}")
+    return names
+
 
 # ────────────────────────────────── main ─────────────────────────────────
 def main() -> None:
@@ -85,17 +392,71 @@ def main() -> None:
     parser.add_argument("-n", "--namespace", help="Kubernetes namespace (default: current-context namespace)")
     parser.add_argument("-s", "--secret", dest="secret_name", help="Name of the Secret to create")
     parser.add_argument("--force", action="store_true", help="Replace an existing Secret if it exists")
+    batch = parser.add_argument_group("batch mode")
+    batch.add_argument("--batch", nargs="+", metavar="NAME", help="Create one Secret per NAME")
+    batch.add_argument("--template", help="Secret name template with {i}, e.g. keystore-pw-{i} (needs --count)")
+    batch.add_argument("--count", type=int, help="Number of Secrets to create from --template")
+    batch.add_argument("--start", type=int, default=0, help="First {i} for --template (default: 0)")
+    batch.add_argument("-w", "--workers", type=int, default=16, help="Concurrent API calls (default: 16)")
+    batch.add_argument("--show", action="store_true", help="Print the generated name/password pairs")
+    sdir = parser.add_argument_group("lighthouse secrets-dir mode")
+    sdir.add_argument("--keystores", nargs="+", metavar="PATH",
+                      help="Keystore files, directories (keystore*.json) or globs; one password file per pubkey")
+    sdir.add_argument("--password-file",
+                      help="Password the keystores are encrypted with (required with --keystores; "
+                           "checked against every keystore)")
+    sdir.add_argument("--out-dir", help="Write one 0x<pubkey> password file per key here (mode 0600)")
+    sdir.add_argument("--secrets-secret", help="Store the password files as Secret keys (NAME-0, NAME-1, ... if sharded)")
+    sdir.add_argument("--shard-bytes", type=int, default=DEFAULT_SHARD_BYTES,
+                      help="Max password bytes per Secret shard (default: %(default)s)")
     args = parser.parse_args()
 
+    if args.keystores:
+        if args.secret_name or args.batch or args.template:
+            parser.error("--keystores cannot be combined with -s, --batch or --template")
+        if not (args.out_dir or args.secrets_secret):
+            parser.error("--keystores needs --out-dir and/or --secrets-secret")
+        if not args.password_file:
+            parser.error("--keystores needs --password-file: a generated password cannot decrypt "
+                         "keystores that already exist")
+        if args.workers < 1 or args.shard_bytes < 1024:
+            parser.error("--workers must be >= 1 and --shard-bytes >= 1024")
+        secrets_dir_mode(args, parser)
+        return
+
+    if args.batch or args.template:
+        if args.secret_name or (args.batch and args.template):
+            parser.error("use only one of -s, --batch and --template")
+        if args.template and (not args.count or args.count < 1 or "{i}" not in args.template):
+            parser.error("--template needs a {i} placeholder and --count >= 1")
+        if args.workers < 1:
+            parser.error("--workers must be >= 1")
+        try:
+            names = batch_names(args)
+            passwords = generate_passwords(len(names), args.length)
+        except ValueError as e:
+            parser.error(str(e))
+        if args.show:
+            for name, password in zip(names, passwords):
+                print(f"{name}\t{password}")
+
+        v1, context_namespace = load_kube_client(args.workers)
+        counts = create_secrets(v1, args.namespace or context_namespace,
+                                {name: {"password": pw} for name, pw in zip(names, passwords)},
+                                args.force, args.workers)
+        print_counts(counts)
+        if counts["failed"]:
+            sys.exit(1)
+        return
+
     password = generate_password(args.length)
     print(f"Generated password: {password}")
 
     if not args.secret_name:
         return  # No Secret requested.
 
-    namespace = args.namespace or get_default_namespace()
-    config.load_kube_config()  # Outside-cluster; switch to load_incluster_config() if desired
-    create_secret(namespace, args.secret_name, password, args.force)
+    v1, context_namespace = load_kube_client()
+    create_secret(args.namespace or context_namespace, args.secret_name, {"password": password}, args.force, v1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+
+
+"""
+Rotate the engine API JWT of one eth-validator release with as little validator downtime as possible.
+
+geth and lighthouse beacon mount `jwt.hex` through a subPath, so they only pick up a new
+secret when their pods restart, and until both have restarted they cannot talk to each other.
+This script:
+
+  1. finds the JWT secret the release mounts and every geth and lighthouse-beacon StatefulSet
+     in the namespace that mounts it (with `geth.enabled=false` and a local beacon there is no
+     geth and the script refuses unless --allow-missing-geth is given; a release with
+     `externalNode.enabled` runs neither, so rotate its node release instead),
+  2. (with --beacon-url and the release's validators) fetches attester, proposer and sync
+     committee duties for this and the next epoch and picks the earliest run of
+     --downtime-slots slots without any duty,
+  3. at the start of the chosen slot replaces the secret in place (resourceVersion-guarded,
+     see create_jwt.py) and
+  4. immediately deletes the geth pods and then the beacon pods,
+  5. watches the StatefulSets until replacement pods report Ready (no fixed sleeps),
+  6. optionally confirms through --beacon-url that the beacon node sees its execution client
+     again, and
+  7. reports the outage window: wall time, the slots it covered and the duties that fell in it.
+
+Usage:
+    ./rotate_jwt.py RELEASE [--namespace NS] [--beacon-url URL]
+                    [--validator-indices 1,2,3 | --pubkeys-file FILE] [--downtime-slots N]
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from kubernetes import client, watch
+from kubernetes.client.exceptions import ApiException
+
+from create_jwt import JWT_VOLUME, ensure_secret, generate_secret, load_kube_api
+
+COMPONENTS = ("geth", "lighthouse-beacon")  # restart order
+PUBKEYS_PER_REQUEST = 64
+
+
+class Chain:
+    """
+    Slot clock and duty lookup against a beacon node API.
+
+    Args:
+        session (requests.Session): HTTP session for the beacon node.
+        url (str): Beacon node base URL.
+    """
+
+    def __init__(self, session, url):
+        self.session = session
+        self.url = url.rstrip("/")
+        self.genesis_time = int(self._get("/eth/v1/beacon/genesis")["genesis_time"])
+        spec = self._get("/eth/v1/config/spec")
+        self.seconds_per_slot = int(spec["SECONDS_PER_SLOT"])
+        self.slots_per_epoch = int(spec["SLOTS_PER_EPOCH"])
+
+    def _get(self, path, **params):
+        resp = self.session.get(self.url + path, params=params, timeout=10)
+        resp.raise_for_status()
+        return resp.json()["data"]
+
+    def _post(self, path, body):
+        resp = self.session.post(self.url + path, json=body, timeout=10)
+        resp.raise_for_status()
+        return resp.json()["data"]
+
+    def slot_at(self, t):
+        """Slot number at wall-clock time t."""
+        return int((t - self.genesis_time) // self.seconds_per_slot)
+
+    def slot_start(self, slot):
+        """Wall-clock start time of a slot."""
+        return self.genesis_time + slot * self.seconds_per_slot
+
+    def resolve_indices(self, pubkeys):
+        """
+        Look up validator indices for pubkeys at the head state.
+
+        Args:
+            pubkeys (list): 0x-prefixed BLS pubkeys.
+
+        Returns:
+            list: Validator indices as strings; unknown pubkeys are skipped.
+        """
+        indices = []
+        for i in range(0, len(pubkeys), PUBKEYS_PER_REQUEST):
+            chunk = pubkeys[i:i + PUBKEYS_PER_REQUEST]
+            indices += [v["index"] for v in self._get("/eth/v1/beacon/states/head/validators", id=",".join(chunk))]
+        return indices
+
+    def duty_slots(self, indices, epochs):
+        """
+        Collect the slots in which any of the given validators has a duty.
+
+        Args:
+            indices (list): Validator indices as strings.
+            epochs (list): Epochs to query (the beacon node answers up to current + 1).
+
+        Returns:
+            dict: slot -> list of duty labels such as 'attest 12' or 'propose 12'.
+        """
+        duties = {}
+        wanted = set(indices)
+        for epoch in epochs:
+            first = epoch * self.slots_per_epoch
+            for d in self._post(f"/eth/v1/validator/duties/attester/{epoch}", indices):
+                duties.setdefault(int(d["slot"]), []).append(f"attest {d['validator_index']}")
+            for d in self._get(f"/eth/v1/validator/duties/proposer/{epoch}"):
+                if d["validator_index"] in wanted:
+                    duties.setdefault(int(d["slot"]), []).append(f"propose {d['validator_index']}")
+            for d in self._post(f"/eth/v1/validator/duties/sync/{epoch}", indices):
+                for slot in range(first, first + self.slots_per_epoch):
+                    duties.setdefault(slot, []).append(f"sync {d['validator_index']}")
+        return duties
+
+    def el_online(self):
+        """Whether the beacon node currently reaches its execution client."""
+        return not self._get("/eth/v1/node/syncing").get("el_offline", False)
+
+
+def choose_window(duties, first_slot, last_slot, length):
+    """
+    Find the earliest run of `length` slots with the fewest duties.
+
+    Args:
+        duties (dict): slot -> duty labels.
+        first_slot (int): Earliest slot the window may start in.
+        last_slot (int): Last slot the window may cover.
+        length (int): Window length in slots.
+
+    Returns:
+        tuple: (start slot, number of duties inside the window).
+    """
+    best = None
+    for start in range(first_slot, max(first_slot, last_slot - length + 1) + 1):
+        hit = sum(len(duties.get(s, ())) for s in range(start, start + length))
+        if best is None or hit < best[1]:
+            best = (start, hit)
+        if hit == 0:
+            break
+    return best
+
+
+def find_components(apps, namespace, release, allow_missing_geth=False):
+    """
+    Locate the release's JWT secret and every geth and lighthouse-beacon StatefulSet mounting it.
+
+    The secret is taken from the release's own StatefulSets, so the release must run its own
+    beacon: with `externalNode.enabled` the chart renders neither geth nor the beacon, and the
+    JWT has to be rotated through the node release that does. With `geth.enabled=false` the
+    beacon mounts the secret but no geth of this release does. The same secret may be mounted
+    by StatefulSets of other releases; a Secret can only be mounted from its own namespace, so
+    all of them are found by scanning the namespace for StatefulSets whose `auth-jwt` volume
+    names it. They all have to restart for the engine API to authenticate again.
+
+    Args:
+        apps (client.AppsV1Api): The apps API client.
+        namespace (str): Namespace of the release.
+        release (str): Helm release name.
+        allow_missing_geth (bool): Carry on when no geth mounts the secret.
+
+    Returns:
+        tuple: (secret name, [(component, StatefulSet name, pod label selector), ...]) in
+        COMPONENTS restart order.
+
+    Raises:
+        SystemExit: If the beacon or the secret reference cannot be found or disagree, or no
+        geth mounts the secret and `allow_missing_geth` is not set.
+    """
+    def component_of(sts):
+        name_label = (sts.metadata.labels or {}).get("app.kubernetes.io/name", "")
+        return next((c for c in COMPONENTS if name_label.endswith("-" + c)), None)
+
+    def jwt_secrets(sts):
+        return {v.secret.secret_name for v in sts.spec.template.spec.volumes or []
+                if v.name == JWT_VOLUME and v.secret}
+
+    own = [sts for sts in apps.list_namespaced_stateful_set(
+        namespace, label_selector=f"app.kubernetes.io/instance={release}"
+    ).items if component_of(sts)]
+    if not any(component_of(sts) == "lighthouse-beacon" for sts in own):
+        print(f"No lighthouse-beacon StatefulSet found for release '{release}' in namespace '{namespace}'. "
+              "A release with externalNode.enabled runs none; rotate the JWT through its node release.")
+        sys.exit(1)
+    secret_names = set().union(*(jwt_secrets(sts) for sts in own))
+    if len(secret_names) != 1:
+        print(f"Expected one JWT secret across geth and beacon, found: {sorted(secret_names) or 'none'}.")
+        sys.exit(1)
+    secret_name = secret_names.pop()
+
+    targets = []
+    for sts in apps.list_namespaced_stateful_set(namespace).items:
+        component = component_of(sts)
+        if component and secret_name in jwt_secrets(sts):
+            selector = ",".join(f"{k}={v}" for k, v in sts.spec.selector.match_labels.items())
+            targets.append((component, sts.metadata.name, selector))
+    targets.sort(key=lambda t: (COMPONENTS.index(t[0]), t[1]))
+    if not any(component == "geth" for component, _, _ in targets):
+        if not allow_missing_geth:
+            print(f"No geth StatefulSet in namespace '{namespace}' mounts secret '{secret_name}': rotating it "
+                  "would leave the execution client on the old token. Use --allow-missing-geth if the "
+                  "execution side is rotated separately.")
+            sys.exit(1)
+        print(f"No geth StatefulSet mounts secret '{secret_name}': only the beacon will be restarted; "
+              "rotate the execution side separately.")
+    return secret_name, targets
+
+
+def pod_ready(pod):
+    """Whether a pod reports the Ready condition."""
+    return any(c.type == "Ready" and c.status == "True" for c in (pod.status.conditions or []))
+
+
+def wait_ready(api, namespace, selector, old_uids, timeout):
+    """
+    Watch pods matching `selector` until one that is not in `old_uids` is Ready.
+
+    Args:
+        api (client.CoreV1Api): The API client.
+        namespace (str): Namespace of the pods.
+        selector (str): Pod label selector.
+        old_uids (set): UIDs of the pods that were deleted.
+        timeout (float): Seconds to wait.
+
+    Returns:
+        float: Wall-clock time at which readiness was observed.
+
+    Raises:
+        TimeoutError: If no replacement pod became Ready in time.
+    """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        pods = api.list_namespaced_pod(namespace, label_selector=selector)
+        if any(p.metadata.uid not in old_uids and pod_ready(p) for p in pods.items):
+            return time.time()
+        w = watch.Watch()
+        try:
+            for event in w.stream(api.list_namespaced_pod, namespace, label_selector=selector,
+                                  resource_version=pods.metadata.resource_version,
+                                  timeout_seconds=max(1, int(deadline - time.time()))):
+                pod = event["object"]
+                if event["type"] != "DELETED" and pod.metadata.uid not in old_uids and pod_ready(pod):
+                    return time.time()
+        except ApiException as e:
+            if e.status != 410:  # 410 Gone: resourceVersion too old, relist
+                raise
+        finally:
+            w.stop()
+    raise TimeoutError(f"no Ready replacement pod for '{selector}' within {timeout:.0f}s")
+
+
+def restart_pods(api, namespace, targets):
+    """
+    Delete the current pods of each StatefulSet, in the given order.
+
+    Args:
+        api (client.CoreV1Api): The API client.
+        namespace (str): Namespace of the pods.
+        targets (list): (component, StatefulSet name, pod label selector) tuples.
+
+    Returns:
+        dict: StatefulSet name -> set of deleted pod UIDs.
+    """
+    old = {}
+    for _, name, selector in targets:
+        pods = api.list_namespaced_pod(namespace, label_selector=selector).items
+        old[name] = {p.metadata.uid for p in pods}
+        for pod in pods:
+            api.delete_namespaced_pod(pod.metadata.name, namespace)
+            print(f"  deleted pod {pod.metadata.name}")
+    return old
+
+
+def load_validator_indices(args, chain):
+    """
+    Collect the release's validator indices from --validator-indices or --pubkeys-file.
+
+    Args:
+        args (argparse.Namespace): Parsed arguments.
+        chain (Chain): Beacon node access, used to resolve pubkeys.
+
+    Returns:
+        list: Validator indices as strings.
+    """
+    if args.validator_indices:
+        return [i.strip() for i in args.validator_indices.split(",") if i.strip()]
+    if args.pubkeys_file:
+        with open(args.pubkeys_file, "r", encoding="utf-8") as f:
+            pubkeys = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+        pubkeys = [pk if pk.startswith("0x") else "0x" + pk for pk in pubkeys]
+        return chain.resolve_indices(pubkeys)
+    return []
+
+
+def main():
+    """
+    Main entry point of the script.
+
+    Parses command-line arguments and runs the rotation steps described in the module docstring.
+    """
+    parser = argparse.ArgumentParser(
+        description="Rotate an eth-validator release's engine API JWT and restart geth and the beacon "
+                    "node together, timed into a gap between the release's validator duties."
+    )
+    parser.add_argument("release", help="Helm release name.")
+    parser.add_argument("--namespace", default="default", help="Namespace of the release (default: default).")
+    parser.add_argument("--beacon-url",
+                        help="Beacon node API used for the slot clock, duties and the post-restart EL check. "
+                             "Without it the restart happens immediately.")
+    parser.add_argument("--validator-indices", help="Comma-separated indices of the release's validators.")
+    parser.add_argument("--pubkeys-file", help="File with the release's validator pubkeys, one per line.")
+    parser.add_argument("--downtime-slots", type=int, default=5,
+                        help="Slots the restart is expected to take; the duty-free gap to look for (default: 5).")
+    parser.add_argument("--ready-timeout", type=float, default=900.0,
+                        help="Seconds to wait for replacement pods to become Ready (default: 900).")
+    parser.add_argument("--el-timeout", type=float, default=120.0,
+                        help="Seconds to wait for the beacon node to report its execution client online "
+                             "after the restart (default: 120).")
+    parser.add_argument("--allow-missing-geth", action="store_true",
+                        help="Rotate even if no geth StatefulSet in the namespace mounts the secret, "
+                             "e.g. with geth.enabled=false and a local beacon (the execution client "
+                             "is then rotated separately).")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Show the chosen window and stop before touching the secret or pods.")
+    args = parser.parse_args()
+    if args.validator_indices and args.pubkeys_file:
+        parser.error("use only one of --validator-indices and --pubkeys-file")
+    if args.downtime_slots < 1:
+        parser.error("--downtime-slots must be >= 1")
+
+    api = load_kube_api(len(COMPONENTS))
+    secret_name, targets = find_components(client.AppsV1Api(api.api_client), args.namespace, args.release,
+                                           args.allow_missing_geth)
+    print(f"Release '{args.release}': secret '{secret_name}', restarting "
+          f"{', '.join(f'{component} {name}' for component, name, _ in targets)}.")
+
+    chain, duties, start_at = None, {}, None
+    if args.beacon_url:
+        session = requests.Session()
+        try:
+            chain = Chain(session, args.beacon_url)
+            indices = load_validator_indices(args, chain)
+            now_slot = chain.slot_at(time.time())
+            epoch = now_slot // chain.slots_per_epoch
+            if indices:
+                duties = chain.duty_slots(indices, [epoch, epoch + 1])
+            else:
+                print("No validator indices given: aligning to the next slot boundary only.")
+        except (requests.RequestException, ValueError, KeyError) as e:
+            print(f"Error reading duties from {args.beacon_url}: {e}")
+            sys.exit(1)
+        last = (epoch + 2) * chain.slots_per_epoch - 1
+        start_slot, expected = choose_window(duties, now_slot + 1, last, args.downtime_slots)
+        start_at = chain.slot_start(start_slot)
+        print(f"Current slot {now_slot}; {len(indices)} validator(s) with duties in {len(duties)} slot(s) "
+              f"over epochs {epoch}-{epoch + 1}.")
+        print(f"Restart window: slots {start_slot}-{start_slot + args.downtime_slots - 1}, "
+              f"starting in {start_at - time.time():.1f}s, {expected} duty(ies) inside.")
+    if args.dry_run:
+        return
+
+    # Write the secret only once the window opens: any pod restarting earlier would pick up
+    # the new token while its peer still runs with the old one.
+    if start_at is not None and start_at > time.time():
+        time.sleep(start_at - time.time())
+    began = time.time()
+    try:
+        outcome = ensure_secret(api, secret_name, args.namespace, generate_secret(), force=True)
+    except ApiException as e:
+        print(f"Error writing secret '{secret_name}': {e.status} {e.reason}")
+        sys.exit(1)
+    print(f"Secret '{secret_name}' {outcome}.")
+    try:
+        old = restart_pods(api, args.namespace, targets)
+        with ThreadPoolExecutor(max_workers=len(targets)) as pool:
+            ready = dict(zip(old, pool.map(
+                lambda t: wait_ready(api, args.namespace, t[2], old[t[1]], args.ready_timeout), targets
+            )))
+    except (ApiException, TimeoutError) as e:
+        print(f"Restart did not complete: {e}")
+        print(f"The new secret is in place; check the pods of release '{args.release}'.")
+        sys.exit(1)
+    ended = max(ready.values())
+    for name, t in ready.items():
+        print(f"  {name} Ready after {t - began:.1f}s")
+
+    if chain is not None:
+        deadline = time.time() + args.el_timeout
+        online = False
+        while not online and time.time() < deadline:
+            try:
+                online = chain.el_online()
+            except (requests.RequestException, ValueError, KeyError):
+                pass
+            if not online:
+                time.sleep(chain.seconds_per_slot / 4)
+        if online:
+            ended = max(ended, time.time())
+        print("Beacon node reports its execution client online." if online else
+              f"Beacon node did not report its execution client online within {args.el_timeout:.0f}s.")
+
+    print(f"Outage: {ended - began:.1f}s", end="")
+    if chain is not None:
+        first_slot, last_slot = chain.slot_at(began), chain.slot_at(ended)
+        hit = {s: duties[s] for s in range(first_slot, last_slot + 1) if s in duties}
+        print(f", slots {first_slot}-{last_slot} ({last_slot - first_slot + 1} slot(s)), "
+              f"{sum(len(v) for v in hit.values())} duty(ies) likely missed")
+        for slot, labels in sorted(hit.items()):
+            print(f"  slot {slot}: {', '.join(labels)}")
+        if not online:
+            sys.exit(1)
+    else:
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -3,7 +3,7 @@
 set_fee_recipient.py — Set Lighthouse per-validator fee recipient via Keymanager API.
 
 Constraints:
-- Pubkey must be provided (0x + 96 hex chars).
+- Pubkey must be provided (0x + 96 hex chars), or a --mapping file of them.
 - No retries; a timeout (>10s) is a permanent error.
 - No environment variables are used.
 - --token-file defaults to ./api-token.txt
@@ -15,55 +15,262 @@ Example:
       --fee-recipient 0x25c4a76E7d118705e7Ea2e9b7d8C59930d8aCD3b \
       --vc-url http://localhost:5062 \
       --token-file ./api-token.txt
+
+Bulk mode (--mapping) reads a CSV (pubkey,fee_recipient) or JSON
+({"0x<pubkey>": "0x<address>", ...}) file, validates every row before any
+request is sent, reads the token once and POSTs through a pooled keep-alive
+session with --workers concurrent requests, then prints a per-status summary:
+  ./set_fee_recipient.py --mapping fee-recipients.csv --workers 16
+
+With --reconcile, bulk mode first lists the keys the VC has loaded
+(GET /eth/v1/keystores), reads each mapped key's current fee recipient
+concurrently, and POSTs only the ones that differ. A run where everything
+already matches makes no writes.
+  ./set_fee_recipient.py --mapping fee-recipients.csv --reconcile
+
+Daemon mode (--watch-configmap) holds the mapping in a Kubernetes ConfigMap
+(one pubkey -> address entry per data key, or a CSV/JSON document under
+--configmap-key). It reconciles once at start, then follows the ConfigMap
+with a resourceVersion watch and, on each change, POSTs only the entries
+that differ from what it last applied, over one warm keep-alive session.
+Entries that fail are retried on the next change or resync.
+  ./set_fee_recipient.py --watch-configmap fee-recipients -n eth-validator \
+      --vc-url http://eth-validator-lighthouse-validator:5062
+
+Fan-out mode (--vc-selector, with --mapping) finds every Ready VC pod
+matching a label selector, pulls each pod's GET /eth/v1/keystores to build
+a pubkey -> pod routing index, and sends each update to the pod that holds
+the key, all pods in parallel with one pooled session per pod. A key loaded
+on more than one pod is reported and left alone.
+  ./set_fee_recipient.py --mapping fee-recipients.csv --all-namespaces \
+      --vc-selector app.kubernetes.io/name=eth-validator-lighthouse-validator \
+      --token-from-pod
+
+Settings-sync mode (--settings) takes one desired-state document covering
+fee recipient, gas limit and graffiti, either JSON
+  {"defaults": {"gas_limit": 30000000},
+   "validators": {"0x<pubkey>": {"fee_recipient": "0x...", "graffiti": "op-a"}}}
+or CSV with a pubkey,fee_recipient,gas_limit,graffiti header (blank cells are
+left unmanaged). Each key's GET/POST calls for all three settings run back
+to back on one pooled keep-alive connection, keys in parallel, and only
+differing values are written. The summary compares the request count with
+separate per-setting reconcile runs.
+  ./set_fee_recipient.py --settings validators.json --workers 16
+
+Plan/apply: --plan FILE (with --mapping) reads current fee recipients
+concurrently and saves a compact snapshot of them, tagged with the VC URL,
+a fingerprint of its loaded keys and a timestamp, together with the diff.
+--apply FILE later POSTs exactly that diff without re-reading every key,
+as long as the snapshot is younger than --plan-ttl and the VC still has
+the same keys loaded (one GET /eth/v1/keystores).
+  ./set_fee_recipient.py --mapping fee-recipients.csv --plan plan.json
+  ./set_fee_recipient.py --apply plan.json
 """
 
 import argparse
+import csv
+import hashlib
+import json
 import os
 import sys
-from typing import Tuple
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
 
 TIMEOUT_SECS = 10.0  # fixed; do not retry
+WATCH_TIMEOUT_SECS = 300  # server-side watch timeout before the stream is renewed
+WATCH_ERROR_BACKOFF_SECS = 5.0
+VC_API_PORT_NAME = "api"  # container port name in the eth-validator chart
+DEFAULT_POD_TOKEN_PATH = "/data/validators/api-token.txt"
+PLAN_FORMAT = 1
 
 
 def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(description="Set Lighthouse per-validator fee recipient")
-    p.add_argument("--pubkey", "-p", required=True,
-                   help="BLS pubkey (0x + 96 hex chars)")
-    p.add_argument("--fee-recipient", "-r", required=True,
-                   help="0x-prefixed Ethereum address (40 hex chars)")
+    target = p.add_mutually_exclusive_group(required=True)
+    target.add_argument("--pubkey", "-p",
+                        help="BLS pubkey (0x + 96 hex chars)")
+    target.add_argument("--mapping", "-m",
+                        help="CSV (pubkey,fee_recipient) or JSON {pubkey: address} file for bulk mode")
+    target.add_argument("--settings",
+                        help="Settings-sync mode: desired fee recipient/gas limit/graffiti document")
+    target.add_argument("--apply",
+                        help="Apply mode: POST the diff saved by --plan in this file")
+    target.add_argument("--watch-configmap",
+                        help="Daemon mode: follow this ConfigMap's pubkey -> address map")
+    p.add_argument("--fee-recipient", "-r",
+                   help="0x-prefixed Ethereum address (40 hex chars); required with --pubkey")
     p.add_argument("--vc-url", default="http://localhost:5062",
                    help="Validator Client base URL (default: %(default)s)")
     p.add_argument("--token-file", "-t", default="api-token.txt",
                    help="Path to VC API token file (default: ./api-token.txt)")
-    return p.parse_args()
+    p.add_argument("--workers", "-w", type=int, default=8,
+                   help="Concurrent requests in bulk mode (default: %(default)s)")
+    p.add_argument("--reconcile", action="store_true",
+                   help="Bulk mode: read current fee recipients first and POST only mismatches")
+    p.add_argument("--plan",
+                   help="Bulk mode: save current state and the diff to this file instead of writing")
+    p.add_argument("--plan-ttl", type=float, default=900.0,
+                   help="Apply mode: refuse snapshots older than this many seconds (default: %(default)s)")
+    p.add_argument("--namespace", "-n",
+                   help="Daemon mode: ConfigMap namespace (default: in-cluster or current context)")
+    p.add_argument("--configmap-key",
+                   help="Daemon mode: data key holding a CSV/JSON mapping "
+                        "(default: each data key is a pubkey)")
+    p.add_argument("--resync-secs", type=float, default=3600.0,
+                   help="Daemon mode: full read-and-diff against the VC this often (default: %(default)s)")
+    p.add_argument("--vc-selector",
+                   help="Fan-out mode: label selector for VC pods; replaces --vc-url")
+    p.add_argument("--all-namespaces", "-A", action="store_true",
+                   help="Fan-out mode: search VC pods in every namespace")
+    p.add_argument("--vc-port", type=int, default=5062,
+                   help=f"Fan-out mode: VC API port when a pod has no '{VC_API_PORT_NAME}' port "
+                        "(default: %(default)s)")
+    p.add_argument("--token-from-pod", action="store_true",
+                   help="Fan-out mode: read each pod's own API token via exec instead of --token-file")
+    p.add_argument("--pod-token-path", default=DEFAULT_POD_TOKEN_PATH,
+                   help="Fan-out mode: token path inside the VC pod (default: %(default)s)")
+    args = p.parse_args()
+    if args.pubkey and not args.fee_recipient:
+        p.error("--fee-recipient is required with --pubkey")
+    if args.workers < 1:
+        p.error("--workers must be at least 1")
+    if args.reconcile and not args.mapping:
+        p.error("--reconcile requires --mapping")
+    if args.vc_selector and not args.mapping:
+        p.error("--vc-selector requires --mapping")
+    if args.plan and (not args.mapping or args.vc_selector):
+        p.error("--plan requires --mapping and a single --vc-url")
+    return args
 
 
-def validate_pubkey(pubkey: str) -> str:
+def parse_pubkey(pubkey: str) -> str:
+    """Normalize a pubkey to 0x-prefixed form; raise ValueError if malformed."""
+    if not isinstance(pubkey, str):
+        raise ValueError(f"pubkey must be a string: {pubkey!r}")
     pk = pubkey.strip()
     if not pk.startswith("0x"):
         pk = "0x" + pk
     if not (pk.startswith("0x") and len(pk) == 98):
-        die("pubkey must be 0x + 96 hex chars (48 bytes)")
+        raise ValueError("pubkey must be 0x + 96 hex chars (48 bytes)")
     try:
         bytes.fromhex(pk[2:])
     except ValueError:
-        die("pubkey is not valid hex")
+        raise ValueError("pubkey is not valid hex") from None
     return pk
 
 
-def validate_eth_address(addr: str) -> str:
+def parse_eth_address(addr: str) -> str:
+    """Check a 0x-prefixed 20-byte address; raise ValueError if malformed."""
+    if not isinstance(addr, str):
+        raise ValueError(f"fee recipient must be a string: {addr!r}")
     a = addr.strip()
     if not (a.startswith("0x") and len(a) == 42):
-        die("fee recipient must be 0x + 40 hex chars")
+        raise ValueError("fee recipient must be 0x + 40 hex chars")
     try:
         bytes.fromhex(a[2:])
     except ValueError:
-        die("fee recipient is not valid hex")
+        raise ValueError("fee recipient is not valid hex") from None
     return a
 
 
+def validate_pubkey(pubkey: str) -> str:
+    try:
+        return parse_pubkey(pubkey)
+    except ValueError as e:
+        die(str(e))
+    return ""  # unreachable
+
+
+def validate_eth_address(addr: str) -> str:
+    try:
+        return parse_eth_address(addr)
+    except ValueError as e:
+        die(str(e))
+    return ""  # unreachable
+
+
+def read_mapping_rows(path: str) -> List[Tuple[str, str, str]]:
+    """Return (location, pubkey, address) rows from a CSV or JSON mapping file."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        text = f.read()
+    return parse_mapping_text(text, is_json=path.lower().endswith(".json"))
+
+
+def parse_mapping_text(text: str, is_json: bool = False) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    """
+    Return (location, pubkey, address) rows from CSV or JSON text.
+    JSON may be an object {pubkey: address} or a list of
+    {"pubkey": ..., "fee_recipient": ...} objects; CSV may have a header row.
+    """
+    if is_json or text.lstrip()[:1] in ("{", "["):
+        data = json.loads(text)
+        if isinstance(data, dict):
+            return [(f"key {k}", str(k), str(v)) for k, v in data.items()]
+        if isinstance(data, list):
+            # A non-object item becomes a None row, which build_mapping reports.
+            return [
+                (f"item {i}", str(row.get("pubkey", "")), str(row.get("fee_recipient", "")))
+                if isinstance(row, dict) else (f"item {i}", None, None)
+                for i, row in enumerate(data, 1)
+            ]
+        raise ValueError("JSON mapping must be an object or a list")
+    rows = []
+    for lineno, row in enumerate(csv.reader(text.splitlines()), 1):
+        if not row or not "".join(row).strip() or row[0].lstrip().startswith("#"):
+            continue
+        if lineno == 1 and row[0].strip().lower() == "pubkey":
+            continue  # header
+        if len(row) < 2:
+            rows.append((f"line {lineno}", row[0], ""))
+        else:
+            rows.append((f"line {lineno}", row[0], row[1]))
+    return rows
+
+
+def load_mapping(path: str) -> Dict[str, str]:
+    """Read and validate every row of a mapping file; die listing all bad rows."""
+    try:
+        rows = read_mapping_rows(path)
+    except (OSError, ValueError) as e:
+        die(f"error reading mapping {path}: {e}")
+    mapping, errors = build_mapping(rows)
+    if errors:
+        die(f"{len(errors)} invalid row(s) in {path}:\n  " + "\n  ".join(errors))
+    if not mapping:
+        die(f"mapping {path} has no rows")
+    return mapping
+
+
+def build_mapping(rows: List[Tuple[str, str, str]]) -> Tuple[Dict[str, str], List[str]]:
+    """
+    Validate (location, pubkey, address) rows; return the mapping and any row
+    errors. Pubkeys are lowercased so differently cased duplicates still meet
+    the conflicting-address check.
+    """
+    mapping: Dict[str, str] = {}
+    errors = []
+    for where, pk, addr in rows:
+        if pk is None:
+            errors.append(f"{where}: not a {{\"pubkey\": ..., \"fee_recipient\": ...}} object")
+            continue
+        try:
+            pubkey = parse_pubkey(pk).lower()
+            address = parse_eth_address(addr)
+        except ValueError as e:
+            errors.append(f"{where}: {e}")
+            continue
+        if pubkey in mapping and mapping[pubkey].lower() != address.lower():
+            errors.append(f"{where}: conflicting fee recipient for {pubkey}")
+            continue
+        mapping[pubkey] = address
+    return mapping, errors
+
+
 def read_token(path: str) -> str:
     if not os.path.isfile(path):
         die(f"token file not found: {path}")
@@ -77,16 +284,54 @@ def read_token(path: str) -> str:
     return token
 
 
-def post_fee_recipient(vc_url: str, token: str, pubkey: str, addr: str) -> Tuple[int, str]:
-    url = f"{vc_url.rstrip('/')}/eth/v1/validator/{pubkey}/feerecipient"
-    headers = {
+def make_session(token: str, pool_size: int) -> requests.Session:
+    """Keep-alive session carrying the bearer token, one pooled socket per worker."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(pool_size, 1))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({
         "Authorization": f"Bearer {token}",
         "Content-Type": "application/json",
-    }
-    payload = {"ethaddress": addr}
-    try:
-        r = requests.post(url, headers=headers, json=payload, timeout=TIMEOUT_SECS)
+    })
+    return session
+
+
+def request_fee_recipient(
+    session: requests.Session, vc_url: str, pubkey: str, addr: str
+) -> Tuple[int, str]:
+    """POST one fee recipient; requests exceptions propagate to the caller."""
+    url = f"{vc_url.rstrip('/')}/eth/v1/validator/{pubkey}/feerecipient"
+    r = session.post(url, json={"ethaddress": addr}, timeout=TIMEOUT_SECS)
+    return r.status_code, (r.text or "")
+
+
+def list_loaded_pubkeys(session: requests.Session, vc_url: str) -> List[str]:
+    """Lowercased pubkeys of every keystore the VC has loaded (Keymanager GET /eth/v1/keystores)."""
+    r = session.get(f"{vc_url.rstrip('/')}/eth/v1/keystores", timeout=TIMEOUT_SECS)
+    if r.status_code != 200:
+        raise requests.HTTPError(
+            f"GET /eth/v1/keystores returned {r.status_code}: {r.text.strip() or '<no body>'}",
+            response=r,
+        )
+    return [k["validating_pubkey"].lower() for k in r.json().get("data", [])]
+
+
+def read_fee_recipient(
+    session: requests.Session, vc_url: str, pubkey: str
+) -> Tuple[int, str]:
+    """GET one fee recipient; return (status, address) or (status, body) on failure."""
+    url = f"{vc_url.rstrip('/')}/eth/v1/validator/{pubkey}/feerecipient"
+    r = session.get(url, timeout=TIMEOUT_SECS)
+    if r.status_code != 200:
         return r.status_code, (r.text or "")
+    return 200, r.json()["data"]["ethaddress"]
+
+
+def post_fee_recipient(vc_url: str, token: str, pubkey: str, addr: str) -> Tuple[int, str]:
+    try:
+        with make_session(token, 1) as session:
+            return request_fee_recipient(session, vc_url, pubkey, addr)
     except requests.Timeout:
         die(f"request timed out after {TIMEOUT_SECS:.0f}s (treating as permanent error)")
     except requests.RequestException as e:
@@ -94,6 +339,715 @@ def post_fee_recipient(vc_url: str, token: str, pubkey: str, addr: str) -> Tuple
     return 0, ""  # unreachable
 
 
+def _bulk_one(
+    session: requests.Session, vc_url: str, pubkey: str, addr: str
+) -> Tuple[str, int, str]:
+    try:
+        status, body = request_fee_recipient(session, vc_url, pubkey, addr)
+    except requests.Timeout:
+        return pubkey, 0, f"timed out after {TIMEOUT_SECS:.0f}s"
+    except requests.RequestException as e:
+        return pubkey, 0, f"request error: {e}"
+    return pubkey, status, body
+
+
+def _read_one(session: requests.Session, vc_url: str, pubkey: str) -> Tuple[str, int, str]:
+    try:
+        status, value = read_fee_recipient(session, vc_url, pubkey)
+    except (requests.RequestException, ValueError, KeyError) as e:
+        return pubkey, 0, f"read error: {e}"
+    return pubkey, status, value
+
+
+def status_label(status: int) -> str:
+    return {
+        202: "202 accepted",
+        401: "401 unauthorized",
+        404: "404 not loaded",
+        0: "no response",
+    }.get(status, f"{status} other")
+
+
+def bulk_set_fee_recipients(
+    vc_url: str, token: str, mapping: Dict[str, str], workers: int
+) -> Counter:
+    """POST every mapping entry concurrently; print failures and return status counts."""
+    with make_session(token, workers) as session, ThreadPoolExecutor(max_workers=workers) as pool:
+        counts, _accepted = _post_all(session, pool, vc_url, mapping)
+        return counts
+
+
+def _post_all(
+    session: requests.Session,
+    pool: ThreadPoolExecutor,
+    vc_url: str,
+    mapping: Dict[str, str],
+) -> Tuple[Counter, Set[str]]:
+    """POST `mapping`; return status counts and the pubkeys the VC accepted."""
+    counts: Counter = Counter()
+    accepted: Set[str] = set()
+    futures = [
+        pool.submit(_bulk_one, session, vc_url, pk, addr)
+        for pk, addr in mapping.items()
+    ]
+    for fut in futures:
+        pubkey, status, body = fut.result()
+        counts[status] += 1
+        if status == 202:
+            accepted.add(pubkey)
+        else:
+            print(f"{pubkey}: {status_label(status)}: {body.strip() or '<no body>'}",
+                  file=sys.stderr)
+    return counts, accepted
+
+
+def diff_fee_recipients(
+    session: requests.Session,
+    pool: ThreadPoolExecutor,
+    vc_url: str,
+    mapping: Dict[str, str],
+    label: str = "",
+) -> Dict[str, str]:
+    """
+    Return the subset of `mapping` whose current fee recipient differs.
+    Keys the VC has not loaded are reported and left out; keys whose
+    current value cannot be read are kept, since a POST is idempotent.
+    Raises if the VC's keystore list cannot be read.
+    """
+    _loaded, current = read_current_state(session, pool, vc_url, mapping)
+    changes = {
+        pk: mapping[pk] for pk, cur in current.items()
+        if cur is None or cur.lower() != mapping[pk].lower()
+    }
+    print(f"{label + ': ' if label else ''}Reconcile: {len(mapping)} mapped, {len(current)} loaded on VC, "
+          f"{len(current) - len(changes)} in sync, {len(changes)} to update")
+    return changes
+
+
+def read_current_state(
+    session: requests.Session,
+    pool: ThreadPoolExecutor,
+    vc_url: str,
+    mapping: Dict[str, str],
+) -> Tuple[List[str], Dict[str, Optional[str]]]:
+    """
+    List the VC's keys, then read the fee recipient of every mapped key it
+    has loaded, concurrently. Returns (loaded pubkeys, pubkey -> current
+    address, or None where it could not be read).
+    """
+    loaded = list_loaded_pubkeys(session, vc_url)
+    loaded_set = set(loaded)
+    targets = [pk for pk in mapping if pk.lower() in loaded_set]
+    for pk in mapping.keys() - set(targets):
+        print(f"{pk}: not loaded on VC, skipped", file=sys.stderr)
+
+    current: Dict[str, Optional[str]] = {}
+    for pubkey, status, value in pool.map(lambda pk: _read_one(session, vc_url, pk), targets):
+        if status != 200:
+            print(f"{pubkey}: could not read current fee recipient ({status_label(status)}), "
+                  "will set it", file=sys.stderr)
+            current[pubkey] = None
+        else:
+            current[pubkey] = value
+    return loaded, current
+
+
+def reconcile_fee_recipients(
+    vc_url: str, token: str, mapping: Dict[str, str], workers: int
+) -> Counter:
+    """Read current state concurrently and POST only mismatched fee recipients."""
+    with make_session(token, workers) as session, ThreadPoolExecutor(max_workers=workers) as pool:
+        try:
+            changes = diff_fee_recipients(session, pool, vc_url, mapping)
+        except (requests.RequestException, ValueError, KeyError) as e:
+            die(f"cannot list VC keystores: {e}")
+        counts, _accepted = _post_all(session, pool, vc_url, changes)
+        return counts
+
+
+# ─────────────────────────────── Plan/apply ─────────────────────────────
+def keys_fingerprint(loaded: List[str]) -> str:
+    """Identify a VC by the set of keys it has loaded."""
+    return hashlib.sha256("\n".join(sorted(loaded)).encode("ascii")).hexdigest()
+
+
+def plan_fee_recipients(
+    vc_url: str, token: str, mapping: Dict[str, str], workers: int, path: str
+) -> int:
+    """Snapshot current state and write it with the diff to `path`; return the diff size."""
+    with make_session(token, workers) as session, ThreadPoolExecutor(max_workers=workers) as pool:
+        try:
+            loaded, current = read_current_state(session, pool, vc_url, mapping)
+        except (requests.RequestException, ValueError, KeyError) as e:
+            die(f"cannot list VC keystores: {e}")
+    diff = {
+        pk: [cur, mapping[pk]] for pk, cur in sorted(current.items())
+        if cur is None or cur.lower() != mapping[pk].lower()
+    }
+    plan = {
+        "format": PLAN_FORMAT,
+        "vc_url": vc_url.rstrip("/"),
+        "keys_sha256": keys_fingerprint(loaded),
+        "created": time.time(),
+        "current": current,
+        "diff": diff,
+    }
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(plan, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+    for pk, (cur, new) in diff.items():
+        print(f"  {pk}: {cur or '<unknown>'} -> {new}")
+    print(f"Plan: {len(mapping)} mapped, {len(current)} loaded on VC, "
+          f"{len(current) - len(diff)} in sync, {len(diff)} to update; saved to {path}")
+    return len(diff)
+
+
+def apply_plan(args: argparse.Namespace) -> Counter:
+    """POST the diff from a saved plan after checking its age and VC identity."""
+    try:
+        with open(args.apply, "r", encoding="utf-8") as f:
+            plan = json.load(f)
+        if plan.get("format") != PLAN_FORMAT:
+            raise ValueError(f"unsupported plan format {plan.get('format')!r}")
+        vc_url, created, diff = plan["vc_url"], float(plan["created"]), plan["diff"]
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        die(f"cannot read plan {args.apply}: {e}")
+
+    age = time.time() - created
+    if age > args.plan_ttl:
+        die(f"plan is {age:.0f}s old (limit {args.plan_ttl:.0f}s); run --plan again")
+    token = read_token(args.token_file)
+    with make_session(token, args.workers) as session, \
+            ThreadPoolExecutor(max_workers=args.workers) as pool:
+        try:
+            loaded = list_loaded_pubkeys(session, vc_url)
+        except (requests.RequestException, ValueError, KeyError) as e:
+            die(f"cannot list VC keystores: {e}")
+        if keys_fingerprint(loaded) != plan["keys_sha256"]:
+            die(f"the keys loaded on {vc_url} changed since the plan was made; run --plan again")
+        print(f"Applying plan from {age:.0f}s ago: {len(diff)} update(s) on {vc_url}")
+        counts, _accepted = _post_all(
+            session, pool, vc_url, {pk: new for pk, (_cur, new) in diff.items()}
+        )
+    return counts
+
+
+# ─────────────────────────── Settings-sync mode ──────────────────────────
+class Setting:
+    """A per-validator Keymanager setting: endpoint suffix, JSON field, parser, comparison."""
+
+    def __init__(self, name: str, path: str, field: str, parse, key) -> None:
+        self.name = name
+        self.path = path
+        self.field = field
+        self.parse = parse
+        self.key = key  # normalizes values for comparison
+
+
+def parse_gas_limit(value) -> str:
+    if value is None or isinstance(value, bool):
+        raise ValueError(f"gas limit must be an integer: {value!r}")
+    try:
+        gas = int(str(value).strip())
+    except ValueError:
+        raise ValueError(f"gas limit must be an integer: {value!r}") from None
+    if gas <= 0:
+        raise ValueError(f"gas limit must be positive: {gas}")
+    return str(gas)
+
+
+def parse_graffiti(value) -> str:
+    if not isinstance(value, str):
+        raise ValueError(f"graffiti must be a string: {value!r}")
+    graffiti = value
+    if len(graffiti.encode("utf-8")) > 32:
+        raise ValueError("graffiti must be at most 32 bytes")
+    return graffiti
+
+
+SETTINGS = (
+    Setting("fee_recipient", "feerecipient", "ethaddress", parse_eth_address, str.lower),
+    Setting("gas_limit", "gas_limit", "gas_limit", parse_gas_limit, lambda v: str(int(v))),
+    Setting("graffiti", "graffiti", "graffiti", parse_graffiti, lambda v: v),
+)
+SETTINGS_BY_NAME = {st.name: st for st in SETTINGS}
+
+
+def load_settings(path: str) -> Dict[str, Dict[str, str]]:
+    """
+    Read and validate a desired-state document; return pubkey -> {setting: value}.
+    Dies listing every invalid entry.
+    """
+    try:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            text = f.read()
+        if path.lower().endswith(".json") or text.lstrip()[:1] == "{":
+            doc = json.loads(text)
+            if not isinstance(doc, dict):
+                raise ValueError("settings document must be a JSON object")
+            defaults = doc.get("defaults") or {}
+            if not isinstance(defaults, dict):
+                raise ValueError("defaults must be a JSON object")
+            validators = doc.get("validators") or {}
+            if not isinstance(validators, dict):
+                raise ValueError("validators must be a JSON object of pubkey -> settings")
+            entries = [(f"validator {pk}", pk, values) for pk, values in validators.items()]
+        else:
+            defaults = {}
+            reader = csv.DictReader(text.splitlines())
+            entries = [
+                (f"line {i}", row.get("pubkey") or "",
+                 {k: v for k, v in row.items() if k != "pubkey" and v not in (None, "")})
+                for i, row in enumerate(reader, 2)
+            ]
+    except (OSError, ValueError) as e:
+        die(f"error reading settings {path}: {e}")
+
+    desired: Dict[str, Dict[str, str]] = {}
+    errors = []
+    for where, pk, values in entries:
+        try:
+            pubkey = parse_pubkey(pk)
+            if values is None:
+                values = {}
+            if not isinstance(values, dict):
+                raise ValueError("settings must be a JSON object")
+            if None in values:
+                # csv.DictReader files cells beyond the header under the None key.
+                raise ValueError("row has more cells than the header")
+            values = {**defaults, **values}
+            unknown = set(values) - SETTINGS_BY_NAME.keys()
+            if unknown:
+                raise ValueError(f"unknown setting(s): {', '.join(sorted(map(str, unknown)))}")
+            desired[pubkey] = {
+                name: SETTINGS_BY_NAME[name].parse(value) for name, value in values.items()
+            }
+        except (ValueError, TypeError, AttributeError) as e:
+            errors.append(f"{where}: {e}")
+    if errors:
+        die(f"{len(errors)} invalid validator entry(s) in {path}:\n  " + "\n  ".join(errors))
+    if not desired:
+        die(f"settings {path} has no validators")
+    return desired
+
+
+def sync_validator_settings(
+    session: requests.Session, vc_url: str, pubkey: str, wanted: Dict[str, str]
+) -> Tuple[str, List[Tuple[str, str, int, str]], int, int]:
+    """
+    Bring one key's settings in line, GET then POST-if-different for each
+    setting in turn on the worker's connection. Returns
+    (pubkey, [(setting, outcome, status, detail)], gets, posts) where
+    outcome is 'in_sync', 'updated' or 'failed'.
+    """
+    base = f"{vc_url.rstrip('/')}/eth/v1/validator/{pubkey}"
+    outcomes = []
+    gets = posts = 0
+    todo = [st for st in SETTINGS if st.name in wanted]
+    for i, st in enumerate(todo):
+        value = wanted[st.name]
+        try:
+            gets += 1
+            r = session.get(f"{base}/{st.path}", timeout=TIMEOUT_SECS)
+            if r.status_code == 200 and st.key(str(r.json()["data"][st.field])) == st.key(value):
+                outcomes.append((st.name, "in_sync", 200, ""))
+                continue
+            if r.status_code == 404:
+                # The key is not loaded; the remaining settings would 404 too.
+                outcomes.extend((x.name, "failed", 404, "validator not loaded") for x in todo[i:])
+                break
+            posts += 1
+            r = session.post(f"{base}/{st.path}", json={st.field: value}, timeout=TIMEOUT_SECS)
+            if r.status_code == 202:
+                outcomes.append((st.name, "updated", 202, ""))
+            else:
+                outcomes.append((st.name, "failed", r.status_code, (r.text or "").strip()))
+        except (requests.RequestException, ValueError, KeyError) as e:
+            outcomes.append((st.name, "failed", 0, str(e)))
+    return pubkey, outcomes, gets, posts
+
+
+def sync_settings(
+    vc_url: str, token: str, desired: Dict[str, Dict[str, str]], workers: int
+) -> int:
+    """Sync every key's settings in parallel; print a summary and return the failure count."""
+    with make_session(token, workers) as session, ThreadPoolExecutor(max_workers=workers) as pool:
+        try:
+            loaded = set(list_loaded_pubkeys(session, vc_url))
+        except (requests.RequestException, ValueError, KeyError) as e:
+            die(f"cannot list VC keystores: {e}")
+        targets = {pk: w for pk, w in desired.items() if pk.lower() in loaded}
+        for pk in desired.keys() - targets.keys():
+            print(f"{pk}: not loaded on VC, skipped", file=sys.stderr)
+
+        tally: Dict[str, Counter] = {st.name: Counter() for st in SETTINGS}
+        gets = posts = 0
+        for pubkey, outcomes, g, p in pool.map(
+            lambda item: sync_validator_settings(session, vc_url, item[0], item[1]),
+            targets.items(),
+        ):
+            gets += g
+            posts += p
+            for name, outcome, status, detail in outcomes:
+                tally[name][outcome] += 1
+                if outcome == "failed":
+                    print(f"{pubkey} {name}: {status_label(status)}: {detail or '<no body>'}",
+                          file=sys.stderr)
+        connections = sum(
+            adapter.poolmanager.pools[k].num_connections
+            for adapter in set(session.adapters.values())
+            for k in adapter.poolmanager.pools.keys()
+        )
+
+    print(f"Settings sync: {len(desired)} validators, {len(targets)} loaded on VC")
+    for name, c in tally.items():
+        if sum(c.values()):
+            print(f"  {name:<14} {c['in_sync']} in sync, {c['updated']} updated, "
+                  f"{c['failed']} failed")
+    # Separate reconcile runs would each list keystores and GET every key
+    # for their one setting over their own connections; the GETs and POSTs
+    # themselves are the same, so the saving is in listings and connections.
+    used = [st.name for st in SETTINGS if sum(tally[st.name].values())]
+    made = 1 + gets + posts
+    naive = len(used) + gets + posts
+    print(f"Requests: {made} ({gets} GET, {posts} POST, 1 list) vs {naive} for "
+          f"{len(used)} per-setting runs; saved {naive - made}. "
+          f"Connections opened: {connections} (per-setting runs: up to "
+          f"{len(used) * min(workers, max(len(targets), 1))})")
+    return sum(c["failed"] for c in tally.values())
+
+
+# ───────────────────────────── Daemon mode ──────────────────────────────
+def guess_default_namespace() -> str:
+    """In-cluster service-account namespace, else kube-context namespace, else 'default'."""
+    sa_ns_file = "/var/run/secrets/kubernetes.io/serviceaccount/namespace"
+    if os.path.exists(sa_ns_file):
+        try:
+            with open(sa_ns_file, "r", encoding="utf-8") as f:
+                ns = f.read().strip()
+                if ns:
+                    return ns
+        except OSError:
+            pass
+    try:
+        from kubernetes import config
+        _contexts, active = config.list_kube_config_contexts()
+        ns = (active or {}).get("context", {}).get("namespace")
+        if ns:
+            return ns
+    except Exception:
+        pass
+    return "default"
+
+
+def configmap_rows(data: Optional[Dict[str, str]], key: Optional[str]) -> List[Tuple[str, str, str]]:
+    """Mapping rows from ConfigMap data: one document under `key`, or one pubkey per data key."""
+    data = data or {}
+    if key:
+        if key not in data:
+            raise ValueError(f"ConfigMap has no data key {key!r}")
+        return parse_mapping_text(data[key], is_json=key.lower().endswith(".json"))
+    return [(f"key {k}", k, v) for k, v in data.items()]
+
+
+class FeeRecipientDaemon:
+    """
+    Keeps the VC's fee recipients in line with a desired mapping.
+
+    `applied` is what this process last saw the VC accept (or found already
+    set); each new mapping is diffed against it so only changed entries are
+    POSTed. resync() rebuilds it from the VC itself.
+    """
+
+    def __init__(self, vc_url: str, token: str, workers: int) -> None:
+        self.vc_url = vc_url
+        self.session = make_session(token, workers)
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.desired: Dict[str, str] = {}
+        self.applied: Dict[str, str] = {}
+
+    def close(self) -> None:
+        self.pool.shutdown()
+        self.session.close()
+
+    def set_desired(self, rows: List[Tuple[str, str, str]]) -> bool:
+        """Adopt a new desired mapping; keep the previous one if any row is invalid."""
+        mapping, errors = build_mapping(rows)
+        if errors:
+            log(f"ignoring ConfigMap update with {len(errors)} invalid row(s):\n  "
+                + "\n  ".join(errors))
+            return False
+        removed = self.desired.keys() - mapping.keys()
+        if removed:
+            log(f"{len(removed)} pubkey(s) removed from the map; their fee recipients are left as is")
+        self.desired = mapping
+        return True
+
+    def apply_delta(self) -> Counter:
+        delta = {
+            pk: addr for pk, addr in self.desired.items()
+            if self.applied.get(pk, "").lower() != addr.lower()
+        }
+        if not delta:
+            log("no changes to apply")
+            return Counter()
+        counts, accepted = _post_all(self.session, self.pool, self.vc_url, delta)
+        for pk in accepted:
+            self.applied[pk] = delta[pk]
+        log(f"applied {len(accepted)} of {len(delta)} changed fee recipient(s)")
+        return counts
+
+    def resync(self) -> Counter:
+        """Full read-and-diff against the VC, then apply what differs."""
+        changes = diff_fee_recipients(self.session, self.pool, self.vc_url, self.desired)
+        self.applied = {pk: addr for pk, addr in self.desired.items() if pk not in changes}
+        return self.apply_delta()
+
+
+def kube_core_api():
+    """CoreV1Api from in-cluster config, falling back to the local kubeconfig."""
+    from kubernetes import client, config
+
+    try:
+        config.load_incluster_config()
+    except config.ConfigException:
+        config.load_kube_config()
+    return client.CoreV1Api()
+
+
+def watch_configmap(args: argparse.Namespace, token: str) -> None:
+    from kubernetes import watch
+    from kubernetes.client.exceptions import ApiException
+    from urllib3.exceptions import HTTPError as TransportError
+
+    v1 = kube_core_api()
+    namespace = args.namespace or guess_default_namespace()
+    name = args.watch_configmap
+
+    daemon = FeeRecipientDaemon(args.vc_url, token, args.workers)
+    resource_version: Optional[str] = None
+    last_resync = float("-inf")
+    # Set by a (re)list and cleared only once a resync gets through, so a VC that is down
+    # is retried after the error backoff instead of waiting out --resync-secs.
+    resync_pending = False
+    log(f"watching ConfigMap {namespace}/{name}; VC {args.vc_url}")
+    try:
+        while True:
+            try:
+                if resource_version is None:
+                    # (Re)list: read the object, then resync with the VC.
+                    cm = v1.read_namespaced_config_map(name, namespace)
+                    resource_version = cm.metadata.resource_version
+                    if daemon.set_desired(configmap_rows(cm.data, args.configmap_key)):
+                        resync_pending = True
+                if resync_pending or time.monotonic() - last_resync >= args.resync_secs:
+                    resync_pending = True
+                    daemon.resync()
+                    resync_pending = False
+                    last_resync = time.monotonic()
+
+                stream = watch.Watch().stream(
+                    v1.list_namespaced_config_map,
+                    namespace,
+                    field_selector=f"metadata.name={name}",
+                    resource_version=resource_version,
+                    timeout_seconds=WATCH_TIMEOUT_SECS,
+                    allow_watch_bookmarks=True,
+                )
+                for event in stream:
+                    etype = event["type"]
+                    if etype == "ERROR":
+                        if (event.get("raw_object") or {}).get("code") == 410:
+                            resource_version = None  # history compacted; relist
+                            break
+                        raise RuntimeError(f"watch error: {event.get('raw_object')}")
+                    obj = event["object"]
+                    resource_version = obj.metadata.resource_version
+                    if etype in ("ADDED", "MODIFIED"):
+                        log(f"ConfigMap {etype.lower()} (resourceVersion {resource_version})")
+                        if daemon.set_desired(configmap_rows(obj.data, args.configmap_key)):
+                            daemon.apply_delta()
+                    elif etype == "DELETED":
+                        log("ConfigMap deleted; keeping current fee recipients")
+            except ApiException as e:
+                if e.status == 410:
+                    resource_version = None
+                    continue
+                log(f"Kubernetes API error (status {e.status}): {e.reason}")
+                resource_version = None if e.status == 404 else resource_version
+                time.sleep(WATCH_ERROR_BACKOFF_SECS)
+            except (requests.RequestException, TransportError, ValueError, KeyError,
+                    RuntimeError) as e:
+                log(f"error: {e}")
+                time.sleep(WATCH_ERROR_BACKOFF_SECS)
+    except KeyboardInterrupt:
+        log("stopping")
+    finally:
+        daemon.close()
+
+
+# ──────────────────────────── Fan-out mode ──────────────────────────────
+class VcEndpoint:
+    """One VC pod: its API URL and a keep-alive session carrying its token."""
+
+    def __init__(self, name: str, url: str, token: str, pool_size: int) -> None:
+        self.name = name
+        self.url = url
+        self.session = make_session(token, pool_size)
+
+
+def _pod_ready(pod) -> bool:
+    if pod.status.phase != "Running" or not pod.status.pod_ip:
+        return False
+    return any(c.type == "Ready" and c.status == "True" for c in pod.status.conditions or [])
+
+
+def _pod_api_port(pod, default_port: int) -> int:
+    for container in pod.spec.containers:
+        for port in container.ports or []:
+            if port.name == VC_API_PORT_NAME:
+                return port.container_port
+    return default_port
+
+
+def read_pod_token(v1, namespace: str, pod: str, path: str) -> str:
+    from kubernetes.stream import stream
+
+    out = stream(
+        v1.connect_get_namespaced_pod_exec, pod, namespace,
+        command=["cat", path], stderr=False, stdin=False, stdout=True, tty=False,
+    )
+    token = (out or "").strip()
+    if not token:
+        raise ValueError(f"empty token at {path}")
+    return token
+
+
+def discover_vc_endpoints(v1, args: argparse.Namespace, pool_size: int) -> List[VcEndpoint]:
+    """Ready pods matching --vc-selector, each with its own session."""
+    if args.all_namespaces:
+        pods = v1.list_pod_for_all_namespaces(label_selector=args.vc_selector).items
+    else:
+        namespace = args.namespace or guess_default_namespace()
+        pods = v1.list_namespaced_pod(namespace, label_selector=args.vc_selector).items
+    shared_token = None if args.token_from_pod else read_token(args.token_file)
+
+    endpoints = []
+    for pod in sorted(pods, key=lambda p: (p.metadata.namespace, p.metadata.name)):
+        name = f"{pod.metadata.namespace}/{pod.metadata.name}"
+        if not _pod_ready(pod):
+            print(f"{name}: not ready, skipped", file=sys.stderr)
+            continue
+        token = shared_token
+        if token is None:
+            try:
+                token = read_pod_token(v1, pod.metadata.namespace, pod.metadata.name,
+                                       args.pod_token_path)
+            except Exception as e:  # exec failures surface as several exception types
+                print(f"{name}: cannot read API token: {e}", file=sys.stderr)
+                continue
+        url = f"http://{pod.status.pod_ip}:{_pod_api_port(pod, args.vc_port)}"
+        endpoints.append(VcEndpoint(name, url, token, pool_size))
+    return endpoints
+
+
+def build_routing_index(
+    endpoints: List[VcEndpoint], pool: ThreadPoolExecutor
+) -> Tuple[Dict[str, VcEndpoint], Dict[str, List[str]]]:
+    """
+    Pull every pod's keystore list in parallel. Return pubkey -> endpoint for
+    keys loaded on exactly one pod, and pubkey -> pod names for duplicates.
+    """
+    def keystores(ep: VcEndpoint) -> Tuple[VcEndpoint, Optional[List[str]]]:
+        try:
+            return ep, list_loaded_pubkeys(ep.session, ep.url)
+        except (requests.RequestException, ValueError, KeyError) as e:
+            print(f"{ep.name}: cannot list keystores: {e}", file=sys.stderr)
+            return ep, None
+
+    owners: Dict[str, List[VcEndpoint]] = {}
+    for ep, pubkeys in pool.map(keystores, endpoints):
+        for pk in pubkeys or []:
+            owners.setdefault(pk, []).append(ep)
+    route = {pk: eps[0] for pk, eps in owners.items() if len(eps) == 1}
+    duplicates = {pk: [ep.name for ep in eps] for pk, eps in owners.items() if len(eps) > 1}
+    return route, duplicates
+
+
+def fanout_set_fee_recipients(
+    args: argparse.Namespace, mapping: Dict[str, str]
+) -> Counter:
+    """Route each mapping entry to the VC pod holding its key and POST them all in parallel."""
+    v1 = kube_core_api()
+    endpoints = discover_vc_endpoints(v1, args, args.workers)
+    if not endpoints:
+        die(f"no ready VC pods match selector {args.vc_selector!r}")
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        try:
+            route, duplicates = build_routing_index(endpoints, pool)
+            for pk, pods in duplicates.items():
+                print(f"{pk}: loaded on {len(pods)} pods ({', '.join(pods)}), skipped",
+                      file=sys.stderr)
+
+            per_pod: Dict[str, Dict[str, str]] = {}
+            unrouted = 0
+            for pk, addr in mapping.items():
+                ep = route.get(pk.lower())
+                if ep is None:
+                    if pk.lower() not in duplicates:
+                        unrouted += 1
+                        print(f"{pk}: not loaded on any VC pod, skipped", file=sys.stderr)
+                    continue
+                per_pod.setdefault(ep.name, {})[pk] = addr
+            by_name = {ep.name: ep for ep in endpoints}
+            print(f"Routing: {len(endpoints)} VC pods, {len(route)} keys indexed, "
+                  f"{sum(len(m) for m in per_pod.values())} mapped keys routed, "
+                  f"{unrouted} unrouted, {len(duplicates)} duplicated")
+
+            if args.reconcile:
+                for pod_name in list(per_pod):
+                    ep = by_name[pod_name]
+                    per_pod[pod_name] = diff_fee_recipients(
+                        ep.session, pool, ep.url, per_pod[pod_name], label=pod_name)
+
+            futures = [
+                (pod_name, pool.submit(_bulk_one, by_name[pod_name].session,
+                                       by_name[pod_name].url, pk, addr))
+                for pod_name, pod_map in per_pod.items()
+                for pk, addr in pod_map.items()
+            ]
+            counts: Counter = Counter()
+            pod_counts: Dict[str, Counter] = {}
+            for pod_name, fut in futures:
+                pubkey, status, body = fut.result()
+                counts[status] += 1
+                pod_counts.setdefault(pod_name, Counter())[status] += 1
+                if status != 202:
+                    print(f"{pod_name} {pubkey}: {status_label(status)}: "
+                          f"{body.strip() or '<no body>'}", file=sys.stderr)
+            for pod_name, c in sorted(pod_counts.items()):
+                print(f"{pod_name}: {c[202]} of {sum(c.values())} accepted")
+            return counts
+        except (requests.RequestException, ValueError, KeyError) as e:
+            die(f"fan-out failed: {e}")
+        finally:
+            for ep in endpoints:
+                ep.session.close()
+    return Counter()  # unreachable
+
+
+def log(msg: str) -> None:
+    print(f"{time.strftime('%Y-%m-%dT%H:%M:%S')} {msg}", flush=True)
+
+
+def print_status_summary(counts: Counter) -> None:
+    print(f"Summary: {sum(counts.values())} validators")
+    for status in sorted(counts, key=lambda s: (s == 0, s)):
+        print(f"  {status_label(status):<18} {counts[status]}")
+
+
 def die(msg: str) -> None:
     print(f"ERROR: {msg}", file=sys.stderr)
     sys.exit(1)
@@ -101,6 +1055,40 @@ def die(msg: str) -> None:
 
 def main() -> None:
     args = parse_args()
+    if args.watch_configmap:
+        watch_configmap(args, read_token(args.token_file))
+        return
+    if args.apply:
+        counts = apply_plan(args)
+        print_status_summary(counts)
+        if set(counts) - {202}:
+            sys.exit(1)
+        return
+    if args.settings:
+        desired = load_settings(args.settings)
+        if sync_settings(args.vc_url, read_token(args.token_file), desired, args.workers):
+            sys.exit(1)
+        return
+    if args.mapping:
+        mapping = load_mapping(args.mapping)
+        if args.plan:
+            plan_fee_recipients(args.vc_url, read_token(args.token_file), mapping,
+                                args.workers, args.plan)
+            return
+        if args.vc_selector:
+            counts = fanout_set_fee_recipients(args, mapping)
+            print_status_summary(counts)
+            if set(counts) - {202}:
+                sys.exit(1)
+            return
+        token = read_token(args.token_file)
+        sync = reconcile_fee_recipients if args.reconcile else bulk_set_fee_recipients
+        counts = sync(args.vc_url, token, mapping, args.workers)
+        print_status_summary(counts)
+        if set(counts) - {202}:
+            sys.exit(1)
+        return
+
     pubkey = validate_pubkey(args.pubkey)
     addr = validate_eth_address(args.fee_recipient)
     token = read_token(args.token_file)